@@ -0,0 +1,185 @@
+import os
+import json
+import random
+import struct
+from datetime import datetime, timedelta
+
+KILL_HEADER = "Kill #,Timestamp,Bot,Weapon,TTK,Shots,Hits,Accuracy,Damage Done,Damage Possible,Efficiency,Cheated,OverShots"
+WEAPON_HEADER = ("Weapon,Shots,Hits,Damage Done,Damage Possible,,Sens Scale,Horiz Sens,Vert Sens,FOV,Hide Gun,"
+                 "Crosshair,Crosshair Scale,Crosshair Color,ADS Sens,ADS Zoom Scale,Avg Target Scale,Avg Time Dilation")
+
+SCENARIO_WORDS = [
+    "VT", "Pasu", "Bounce", "Ground", "Plaza", "Air", "Voltaic", "Tile", "Frenzy", "Smoothbot", "Controlsphere",
+    "1wall6targets", "Close", "Long", "Strafes", "Angelic", "Popcorn", "Sixshot", "Thin", "Goated", "Reload"
+]
+SCENARIO_SUFFIXES = ["", " Easy", " Intermediate", " Advanced", " S5", " 90%", " TE", " Small"]
+
+
+def scenario_names(count, seed=0):
+    rng = random.Random(seed)
+    names = []
+    seen = set()
+    while len(names) < count:
+        name = " ".join(rng.sample(SCENARIO_WORDS, rng.randint(1, 3))) + rng.choice(SCENARIO_SUFFIXES)
+        if name not in seen:
+            seen.add(name)
+            names.append(name)
+    return names
+
+
+def stats_csv(scenario_name, score, kills=60, shots=200, hits=150, sensitivity=34.6):
+    lines = [KILL_HEADER]
+    for kill in range(1, kills + 1):
+        lines.append(f"{kill},12:00:{kill % 60:02d}.{kill % 1000:03d},Target,Pistol,0.512s,3,1,0.333333,"
+                     f"100.0,300.0,0.333333,false,0")
+    lines.extend([
+        "",
+        WEAPON_HEADER,
+        f"Pistol,{shots},{hits},{hits * 100}.0,{shots * 100}.0,,cm/360,{sensitivity},{sensitivity},103.0,false,"
+        f"default.png,1.0,FFFFFF,{sensitivity},1.0,1.0,1.0",
+        "",
+        f"Kills:,{kills}",
+        "Deaths:,0",
+        "Fight Time:,60.000000",
+        "Avg TTK:,0.512000",
+        f"Damage Done:,{hits * 100}.0",
+        "Damage Taken:,0.0",
+        "Midairs:,0",
+        "Midaired:,0",
+        "Directs:,0",
+        "Directed:,0",
+        "Distance Traveled:,0.0",
+        f"Score:,{score:.6f}",
+        f"Scenario:,{scenario_name}",
+        "Hash:,0123456789abcdef0123456789abcdef",
+        "Game Version:,3.6.1.2024-12-01-00-00-00-00000000",
+        "Challenge Start:,12:00:00.000",
+        "Input Lag:,0",
+        "Max FPS (config):,0",
+        "Sens Scale:,cm/360",
+        f"Horiz Sens:,{sensitivity}",
+        f"Vert Sens:,{sensitivity}",
+        "FOV:,103.0",
+        "Hide Gun:,false",
+        "Crosshair:,default.png",
+        "Crosshair Scale:,1.0",
+        "Crosshair Color:,FFFFFF",
+        "Resolution:,1920x1080",
+        "Avg FPS:,240.0",
+        "Resolution Scale:,100.0",
+        ""
+    ])
+    return "\r\n".join(lines)
+
+
+def stats_file_name(scenario_name, played_at):
+    return f"{scenario_name} - Challenge - {played_at.strftime('%Y.%m.%d-%H.%M.%S')} Stats.csv"
+
+
+def generate_stats_directory(path, file_count, scenario_count=None, kills=60, seed=0):
+    os.makedirs(path, exist_ok=True)
+    rng = random.Random(seed)
+    scenario_count = scenario_count or max(1, file_count // 50)
+    names = scenario_names(scenario_count, seed)
+    base_scores = {name: rng.uniform(300, 3000) for name in names}
+    played_at = datetime(2020, 1, 1)
+    created = []
+    for _ in range(file_count):
+        name = rng.choice(names)
+        played_at += timedelta(seconds=rng.randint(61, 3600))
+        score = base_scores[name] * rng.uniform(0.7, 1.1)
+        file_name = stats_file_name(name, played_at)
+        with open(os.path.join(path, file_name), "w", newline="") as f:
+            f.write(stats_csv(name, score, kills=kills))
+        created.append(file_name)
+    return names, created
+
+
+def _fstring(value):
+    encoded = value.encode("utf-8") + b"\0"
+    return struct.pack("<i", len(encoded)) + encoded
+
+
+def _property(name, type_name, value):
+    if type_name in ("StrProperty", "NameProperty"):
+        body = _fstring(value)
+    elif type_name == "IntProperty":
+        body = struct.pack("<i", value)
+    elif type_name == "FloatProperty":
+        body = struct.pack("<f", value)
+    else:
+        raise ValueError(type_name)
+    return _fstring(name) + _fstring(type_name) + struct.pack("<q", len(body)) + b"\0" + body
+
+
+def _bool_property(name, value):
+    return _fstring(name) + _fstring("BoolProperty") + struct.pack("<q", 0) + bytes([1 if value else 0]) + b"\0"
+
+
+def session_sav(scenario_name, padding_properties=20):
+    header = b"GVAS" + struct.pack("<ii", 2, 522)
+    header += struct.pack("<hhhi", 4, 27, 2, 0) + _fstring("++UE4+Release-4.27")
+    header += struct.pack("<ii", 3, 2)
+    for index in range(2):
+        header += bytes([index + 1] * 16) + struct.pack("<i", index + 1)
+    header += _fstring("/Script/FPSAimTrainer.SessionSaveGame")
+
+    body = b""
+    for index in range(padding_properties):
+        body += _property(f"Stat{index}", "IntProperty", index)
+    body += _property("ScenarioName", "StrProperty", scenario_name)
+    body += _property("FullScenarioPath", "StrProperty",
+                      f"../../../FPSAimTrainer/Saved/SaveGames/Scenarios/{scenario_name}.sce")
+    body += _property("Sensitivity", "FloatProperty", 34.6)
+    body += _bool_property("bIsChallenge", True)
+    body += _fstring("None")
+    return header + body + b"\0\0\0\0"
+
+
+def write_session_sav(local_app_data, scenario_name):
+    path = os.path.join(local_app_data, "FPSAimTrainer", "Saved", "SaveGames", "session.sav")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(session_sav(scenario_name))
+    return path
+
+
+def playlist_json(playlist_name, scenarios, share_code):
+    data = {
+        "playlistName": playlist_name,
+        "playlistId": 123456,
+        "authorSteamId": "76561198000000000",
+        "authorName": "bench",
+        "scenarioList": [{"scenario_name": name, "play_Count": 1} for name in scenarios],
+        "description": "",
+        "hasOfflineScenarios": False,
+        "hasEdited": False,
+        "shareCode": share_code,
+        "version": 1,
+        "markedForDeletion": False
+    }
+    return json.dumps(data, indent="\t").replace("\n", "\r\n")
+
+
+def write_playlist(installation_path, playlist_name, scenarios, share_code="KovaaKsBenchmarkPlaylist"):
+    path = os.path.join(installation_path, "Saved", "SaveGames", "PlaylistInProgress.json")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", newline="") as f:
+        f.write(playlist_json(playlist_name, scenarios, share_code))
+    return path
+
+
+def total_play_entries(count, seed=0):
+    rng = random.Random(seed)
+    entries = []
+    for index, name in enumerate(scenario_names(count, seed)):
+        entries.append({
+            "leaderboardId": 10000 + index,
+            "scenarioName": name,
+            "counts": {"plays": rng.randint(1, 500)},
+            "rank": rng.randint(1, 50000),
+            "score": round(rng.uniform(300, 3000), 2),
+            "attributes": {"fov": 103, "sens": 34.6}
+        })
+    entries.sort(key=lambda entry: entry["counts"]["plays"], reverse=True)
+    return entries
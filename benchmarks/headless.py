@@ -0,0 +1,150 @@
+import os
+import sys
+import time
+import socket
+import argparse
+import tempfile
+import subprocess
+
+from benchmarks.run import Fixture, fake_process_finder
+from benchmarks.startup import ROOT, parse_importtime
+from modules.control import CONTROL_TOKEN_FILE, send_command
+
+MEMORY_BUDGET_MB = 80
+IDLE_CPU_BUDGET = 1.0
+IDLE_SECONDS = 30
+STARTUP_TIMEOUT = 15
+FORBIDDEN_MODULES = ("pystray", "PIL", "tkinter", "customtkinter", "modules.tray", "modules.gui")
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_engine(port, process, token_file, state=None):
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            return None
+        try:
+            status = send_command("status", port=port, timeout=1, token_file=token_file)
+            if state is None or status.get("result", {}).get("state") == state:
+                return status
+        except OSError:
+            pass
+        time.sleep(0.1)
+    return None
+
+
+class IdlePresence:
+    def __init__(self, client_id):
+        pass
+
+    def connect(self):
+        pass
+
+    def update(self, **payload):
+        pass
+
+    def close(self):
+        pass
+
+
+def serve_connected(installation_path, port):
+    from modules.engine import run_headless
+    from modules.log import setup_logging, shutdown_logging
+    from modules.process_detector import ProcessDetector
+
+    setup_logging("WARNING")
+    try:
+        return run_headless(installation_path, port, start_rpc=True, presence_factory=IdlePresence,
+                            process_detector=ProcessDetector(finder=fake_process_finder(0)))
+    finally:
+        shutdown_logging()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure headless engine memory and idle CPU against a budget")
+    parser.add_argument("--files", type=int, default=1000, help="number of stats CSVs to generate")
+    parser.add_argument("--data-dir", default=None, help="reuse generated fixtures from this directory")
+    parser.add_argument("--idle", type=float, default=IDLE_SECONDS, help="seconds to sample idle CPU")
+    parser.add_argument("--memory-budget", type=float, default=MEMORY_BUDGET_MB, help="resident memory limit in MB")
+    parser.add_argument("--cpu-budget", type=float, default=IDLE_CPU_BUDGET, help="idle CPU limit in percent")
+    parser.add_argument("--connected", action="store_true",
+                        help="measure with a fake game running, RPC connected and the stats watcher started")
+    parser.add_argument("--serve-connected", metavar="INSTALLATION_PATH", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.serve_connected:
+        return serve_connected(args.serve_connected, args.port)
+
+    import psutil
+
+    root = args.data_dir or tempfile.mkdtemp(prefix="kovaaks_bench_")
+    os.makedirs(root, exist_ok=True)
+    fixture = Fixture(root, args.files, None)
+    port = free_port()
+    env = dict(os.environ, LOCALAPPDATA=fixture.local_app_data)
+    log_path = os.path.join(root, "headless.stderr")
+
+    if args.connected:
+        command = ["-m", "benchmarks.headless", "--serve-connected", fixture.installation_path, "--port", str(port)]
+        state = "IN_SCENARIO"
+    else:
+        command = ["-m", "modules.engine", "--headless", "--port", str(port),
+                   "--installation-path", fixture.installation_path, "--log-level", "WARNING"]
+        state = None
+
+    with open(log_path, "w", encoding="utf-8") as stderr:
+        process = subprocess.Popen(
+            [sys.executable, "-X", "importtime"] + command,
+            cwd=root, env=dict(env, PYTHONPATH=ROOT), stdout=subprocess.DEVNULL, stderr=stderr)
+        try:
+            token_file = os.path.join(root, CONTROL_TOKEN_FILE)
+            status = wait_for_engine(port, process, token_file, state)
+            if status is None or not status.get("ok"):
+                print(f"Headless engine did not start, see {log_path}")
+                return 1
+
+            engine_process = psutil.Process(process.pid)
+            time.sleep(min(5.0, args.idle))
+            cpu_start = sum(engine_process.cpu_times()[:2])
+            time.sleep(args.idle)
+            cpu_used = sum(engine_process.cpu_times()[:2]) - cpu_start
+            rss_mb = engine_process.memory_info().rss / (1024 * 1024)
+            metrics = send_command("metrics", port=port, token_file=token_file).get("result", {})
+            send_command("quit", port=port, token_file=token_file)
+            process.wait(timeout=10)
+        finally:
+            if process.poll() is None:
+                process.kill()
+
+    with open(log_path, "r", encoding="utf-8") as f:
+        imported = {name.strip() for name, _, _ in parse_importtime(f.read())}
+
+    cpu_percent = cpu_used / args.idle * 100
+    print(f"state            {'RPC connected, watcher running' if args.connected else 'game not running'}")
+    print(f"resident memory  {rss_mb:8.1f} MB  (budget {args.memory_budget:.0f} MB)")
+    print(f"idle CPU         {cpu_percent:8.2f} %   (budget {args.cpu_budget:.2f} %, {args.idle:.0f} s sample)")
+    for name, stats in sorted(metrics.get("timers", {}).items()):
+        print(f"    {name:<20} p50 {stats['p50'] * 1000:8.2f} ms  max {stats['max'] * 1000:8.2f} ms")
+
+    failures = []
+    if rss_mb > args.memory_budget:
+        failures.append("resident memory over budget")
+    if cpu_percent > args.cpu_budget:
+        failures.append("idle CPU over budget")
+    loaded = [name for name in FORBIDDEN_MODULES if name in imported]
+    if loaded:
+        failures.append(f"loaded GUI modules: {', '.join(loaded)}")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
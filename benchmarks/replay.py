@@ -0,0 +1,305 @@
+import os
+import sys
+import json
+import time
+import base64
+import random
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+
+from benchmarks import generators
+from benchmarks.run import fake_process_finder
+
+SESSION = "session"
+STATS = "stats"
+PLAYLIST = "playlist"
+RECORD_INTERVAL = 0.05
+CONNECT_TIMEOUT = 15
+SETTLE_SECONDS = 3
+
+
+def event(offset, kind, name, data):
+    return {"t": round(offset, 3), "kind": kind, "name": name, "data": base64.b64encode(data).decode("ascii")}
+
+
+def load_timeline(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def save_timeline(events, path):
+    with open(path, "w", encoding="utf-8") as f:
+        for item in events:
+            f.write(json.dumps(item) + "\n")
+
+
+def replay_paths(root):
+    installation_path = os.path.join(root, "FPSAimTrainer")
+    local_app_data = os.path.join(root, "LocalAppData")
+    return {
+        "installation_path": installation_path,
+        STATS: os.path.join(installation_path, "stats"),
+        SESSION: os.path.join(local_app_data, "FPSAimTrainer", "Saved", "SaveGames", "session.sav"),
+        PLAYLIST: os.path.join(installation_path, "Saved", "SaveGames", "PlaylistInProgress.json"),
+    }
+
+
+def record(installation_path, local_app_data, duration):
+    from modules.playlist import PLAYLIST_FILE
+
+    watched = {
+        SESSION: os.path.join(local_app_data, "FPSAimTrainer", "Saved", "SaveGames", "session.sav"),
+        PLAYLIST: os.path.join(installation_path, PLAYLIST_FILE),
+    }
+    stats_directory = os.path.join(installation_path, "stats")
+    signatures = {}
+    known_stats = set(os.listdir(stats_directory)) if os.path.isdir(stats_directory) else set()
+    events = []
+    start = time.monotonic()
+
+    def signature(path):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def capture(kind, path, offset):
+        try:
+            with open(path, "rb") as f:
+                events.append(event(offset, kind, os.path.basename(path), f.read()))
+        except OSError:
+            pass
+
+    while time.monotonic() - start < duration:
+        offset = time.monotonic() - start
+        for kind, path in watched.items():
+            current = signature(path)
+            if current is not None and current != signatures.get(kind):
+                signatures[kind] = current
+                capture(kind, path, offset)
+        if os.path.isdir(stats_directory):
+            for name in sorted(set(os.listdir(stats_directory)) - known_stats):
+                if name.endswith(".csv"):
+                    capture(STATS, os.path.join(stats_directory, name), offset)
+                known_stats.add(name)
+        time.sleep(RECORD_INTERVAL)
+    return events
+
+
+def synthetic_timeline(minutes, run_seconds=60, runs_per_scenario=3, seed=0):
+    rng = random.Random(seed)
+    scenarios = generators.scenario_names(max(2, int(minutes * 60 / run_seconds / runs_per_scenario) + 1), seed)
+    playlist = generators.playlist_json("Replay", scenarios, "KovaaKsReplayPlaylist").encode("utf-8")
+    events = [event(0, PLAYLIST, "PlaylistInProgress.json", playlist)]
+    base_scores = {name: rng.uniform(300, 3000) for name in scenarios}
+    played_at = datetime(2024, 1, 1)
+    offset = 0.0
+    run = 0
+    while offset < minutes * 60:
+        scenario = scenarios[run // runs_per_scenario % len(scenarios)]
+        events.append(event(offset, SESSION, "session.sav", generators.session_sav(scenario)))
+        offset += run_seconds * rng.uniform(0.9, 1.1)
+        played_at += timedelta(seconds=run_seconds)
+        csv = generators.stats_csv(scenario, base_scores[scenario] * rng.uniform(0.8, 1.1))
+        events.append(event(offset, STATS, generators.stats_file_name(scenario, played_at), csv.encode("utf-8")))
+        offset += rng.uniform(2, 8)
+        run += 1
+    return events
+
+
+class ReplayPresence:
+    updates = []
+
+    def __init__(self, client_id):
+        pass
+
+    def connect(self):
+        pass
+
+    def update(self, **payload):
+        ReplayPresence.updates.append((time.monotonic(), payload))
+
+    def close(self):
+        pass
+
+
+def write_event(paths, item):
+    if item["kind"] == STATS:
+        path = os.path.join(paths[STATS], item["name"])
+    else:
+        path = paths[item["kind"]]
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(base64.b64decode(item["data"]))
+
+
+def replay(events, speed=1.0, root=None, settle=SETTLE_SECONDS):
+    from modules.engine import Engine
+    from modules.kovaaks_utils import SessionReader, scenario_from_filename
+    from modules.metrics import metrics
+    from modules.process_detector import ProcessDetector
+
+    root = root or tempfile.mkdtemp(prefix="kovaaks_replay_")
+    paths = replay_paths(root)
+    os.makedirs(paths[STATS], exist_ok=True)
+    events = sorted(events, key=lambda item: item["t"])
+    origin = events[0]["t"] if events else 0
+    initial, timeline = [], []
+    for item in events:
+        (initial if item["t"] <= origin and item["kind"] != STATS else timeline).append(item)
+    for item in initial:
+        write_event(paths, item)
+
+    ReplayPresence.updates = []
+    metrics.enabled = True
+    cwd = os.getcwd()
+    os.chdir(root)
+    engine = Engine({"open_manually": False}, paths["installation_path"], presence_factory=ReplayPresence,
+                    process_detector=ProcessDetector(finder=fake_process_finder(0)),
+                    session_reader=SessionReader(paths[SESSION]))
+    try:
+        engine.start()
+        deadline = time.monotonic() + CONNECT_TIMEOUT
+        while not engine.rpc_running and time.monotonic() < deadline:
+            time.sleep(0.05)
+        if not engine.rpc_running:
+            raise RuntimeError("Engine did not connect to the fake presence")
+
+        writes = []
+        metrics.reset()
+        cpu_start = time.process_time()
+        start = time.monotonic()
+        for item in timeline:
+            delay = start + (item["t"] - origin) / speed - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            write_event(paths, item)
+            if item["kind"] == STATS:
+                writes.append((time.monotonic(), scenario_from_filename(item["name"])))
+        time.sleep(settle)
+        elapsed = time.monotonic() - start
+        cpu_time = time.process_time() - cpu_start
+        snapshot = metrics.snapshot()
+    finally:
+        engine.stop()
+        os.chdir(cwd)
+
+    simulated_minutes = max(elapsed * speed / 60, 1 / 60)
+    updates = ReplayPresence.updates
+    latencies = []
+    missed = 0
+    for index, (written, scenario) in enumerate(writes):
+        next_write = writes[index + 1][0] if index + 1 < len(writes) else float("inf")
+        matched = run_update(updates, scenario, written, next_write)
+        if matched is None:
+            missed += 1
+        else:
+            latencies.append(matched - written)
+
+    wakeups = {name: stats["count"] for name, stats in snapshot["timers"].items()
+               if name in ("process_scan", "scenario_tick", "stats_file")}
+    return {
+        "events": len(timeline),
+        "stats_writes": len(writes),
+        "updates": len(updates),
+        "speed": speed,
+        "simulated_minutes": simulated_minutes,
+        "latency": summarize(latencies),
+        "missed": missed,
+        "cpu_ms_per_minute": cpu_time * 1000 / simulated_minutes,
+        "wakeups_per_minute": sum(wakeups.values()) / simulated_minutes,
+        "wakeups": wakeups,
+    }
+
+
+def run_view(payload):
+    return payload.get("state"), payload.get("large_text")
+
+
+def run_update(updates, scenario, written, next_write):
+    details = f"Playing: {scenario}"
+    shown = None
+    for updated, payload in updates:
+        if updated >= next_write:
+            break
+        if payload.get("details") != details:
+            continue
+        if updated < written:
+            shown = run_view(payload)
+        elif run_view(payload) != shown:
+            return updated
+    return None
+
+
+def summarize(samples):
+    if not samples:
+        return None
+    samples = sorted(samples)
+    return {
+        "p50": samples[len(samples) // 2],
+        "p95": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+        "max": samples[-1],
+    }
+
+
+def print_report(report):
+    print(f"replayed {report['events']} events over {report['simulated_minutes']:.1f} simulated minutes "
+          f"at {report['speed']:g}x, {report['updates']} presence updates")
+    latency = report["latency"]
+    if latency:
+        print(f"csv -> update   p50 {latency['p50'] * 1000:8.1f} ms  p95 {latency['p95'] * 1000:8.1f} ms  "
+              f"max {latency['max'] * 1000:8.1f} ms  ({report['missed']} of {report['stats_writes']} unmatched)")
+    else:
+        print(f"csv -> update   no matched updates ({report['stats_writes']} stats writes)")
+    print(f"CPU time        {report['cpu_ms_per_minute']:8.1f} ms per simulated minute")
+    breakdown = ", ".join(f"{name} {count}" for name, count in sorted(report["wakeups"].items()))
+    print(f"wakeups         {report['wakeups_per_minute']:8.1f} per simulated minute ({breakdown})")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Record and replay KovaaK's file activity against the engine")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record_parser = commands.add_parser("record", help="capture session.sav, stats and playlist writes")
+    record_parser.add_argument("--installation-path", required=True)
+    record_parser.add_argument("--local-app-data", default=os.getenv("LOCALAPPDATA", ""))
+    record_parser.add_argument("--duration", type=float, default=600, help="seconds to record")
+    record_parser.add_argument("--output", required=True)
+
+    synth_parser = commands.add_parser("synth", help="write a synthetic timeline")
+    synth_parser.add_argument("--minutes", type=float, default=10)
+    synth_parser.add_argument("--run-seconds", type=float, default=60)
+    synth_parser.add_argument("--output", required=True)
+
+    replay_parser = commands.add_parser("replay", help="replay a timeline into a temp directory")
+    replay_parser.add_argument("timeline", nargs="?", help="recorded timeline, synthetic if omitted")
+    replay_parser.add_argument("--minutes", type=float, default=5, help="length of the synthetic timeline")
+    replay_parser.add_argument("--speed", type=float, default=1.0, help="replay speed multiplier")
+    replay_parser.add_argument("--data-dir", default=None, help="directory to replay into")
+    replay_parser.add_argument("--output", default=None, help="write the report as JSON")
+    args = parser.parse_args(argv)
+
+    if args.command == "record":
+        events = record(args.installation_path, args.local_app_data, args.duration)
+        save_timeline(events, args.output)
+        print(f"Recorded {len(events)} events to {args.output}")
+        return 0
+    if args.command == "synth":
+        events = synthetic_timeline(args.minutes, args.run_seconds)
+        save_timeline(events, args.output)
+        print(f"Wrote {len(events)} events to {args.output}")
+        return 0
+
+    events = load_timeline(args.timeline) if args.timeline else synthetic_timeline(args.minutes)
+    report = replay(events, args.speed, args.data_dir)
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,432 @@
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import statistics
+import tempfile
+
+from benchmarks import generators
+
+BASELINE_FILE = os.path.join(os.path.dirname(__file__), "baseline.json")
+RESULTS_FILE = os.path.join(os.path.dirname(__file__), "results.json")
+LARGE_FILE_KILLS = 5000
+
+BENCHMARKS = []
+
+
+def benchmark(name):
+    def decorator(func):
+        BENCHMARKS.append((name, func))
+        return func
+    return decorator
+
+
+class Fixture:
+    def __init__(self, root, file_count, scenario_count):
+        self.root = root
+        self.file_count = file_count
+        self.installation_path = os.path.join(root, "FPSAimTrainer")
+        self.stats_directory = os.path.join(self.installation_path, "stats")
+        self.local_app_data = os.path.join(root, "LocalAppData")
+        self.marker = os.path.join(root, f"fixture-{file_count}-{scenario_count}.json")
+
+        if os.path.exists(self.marker):
+            with open(self.marker, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.scenarios = data["scenarios"]
+            self.files = data["files"]
+        else:
+            self.scenarios, self.files = generators.generate_stats_directory(
+                self.stats_directory, file_count, scenario_count)
+            with open(self.marker, "w", encoding="utf-8") as f:
+                json.dump({"scenarios": self.scenarios, "files": self.files}, f)
+
+        counts = {}
+        for file_name in self.files:
+            scenario = file_name.rsplit(" - ", 2)[0]
+            counts[scenario] = counts.get(scenario, 0) + 1
+        self.scenario = max(counts, key=counts.get)
+        self.session_path = generators.write_session_sav(self.local_app_data, self.scenario)
+        self.playlist_path = generators.write_playlist(self.installation_path, "Benchmark", self.scenarios[:10])
+        self.sample_file = os.path.join(self.stats_directory, self.files[-1])
+        self.large_sample_file = os.path.join(root, f"large-{LARGE_FILE_KILLS}.csv")
+        if not os.path.exists(self.large_sample_file):
+            with open(self.large_sample_file, "w", encoding="utf-8") as f:
+                f.write(generators.stats_csv(self.scenario, 1000.0, kills=LARGE_FILE_KILLS))
+
+
+def line_scan_score(file_path):
+    score = None
+    with open(file_path, 'r') as file:
+        for line in file:
+            if "Score:," in line:
+                score = float(line.split(',')[1])
+    return score
+
+
+@benchmark("find_initial_scores")
+def bench_find_initial_scores(fixture):
+    from modules.kovaaks_utils import find_initial_scores
+    return lambda: find_initial_scores(fixture.scenario, fixture.stats_directory)
+
+
+@benchmark("find_fight_time_and_score")
+def bench_find_fight_time_and_score(fixture):
+    from modules.kovaaks_utils import find_fight_time_and_score
+    return lambda: find_fight_time_and_score(fixture.scenario, fixture.stats_directory, set())
+
+
+@benchmark("run_history_cold_sync")
+def bench_run_history_cold(fixture):
+    from modules.run_history import RunHistory
+    database = os.path.join(fixture.root, "bench_history_cold.db")
+
+    def run():
+        if os.path.exists(database):
+            os.remove(database)
+        history = RunHistory(fixture.stats_directory, database)
+        history.sync()
+        history.close()
+    return run
+
+
+def stats_entries(fixture):
+    entries = []
+    with os.scandir(fixture.stats_directory) as scan:
+        for entry in scan:
+            stat = entry.stat()
+            entries.append((entry.name, entry.path, stat.st_size, stat.st_mtime_ns))
+    return entries
+
+
+@benchmark("ingest_serial")
+def bench_ingest_serial(fixture):
+    from modules.ingest import parse_chunk
+    entries = stats_entries(fixture)
+    return lambda: parse_chunk(entries)
+
+
+@benchmark("ingest_parallel")
+def bench_ingest_parallel(fixture):
+    from modules.ingest import ingest_runs
+    entries = stats_entries(fixture)
+    return lambda: sum(len(rows) for rows, _ in ingest_runs(entries))
+
+
+def warm_history(fixture):
+    from modules.run_history import RunHistory
+    history = RunHistory(fixture.stats_directory, os.path.join(fixture.root, "bench_history_warm.db"))
+    history.sync()
+    return history
+
+
+@benchmark("run_history_lookup")
+def bench_run_history_lookup(fixture):
+    history = warm_history(fixture)
+
+    def run():
+        history.sync()
+        return history.best(fixture.scenario), history.session_best(fixture.scenario, 0)
+    return run
+
+
+@benchmark("run_history_percentile")
+def bench_run_history_percentile(fixture):
+    history = warm_history(fixture)
+    return lambda: (history.run_count(fixture.scenario), history.percentile(fixture.scenario, 1000))
+
+
+@benchmark("run_stats")
+def bench_run_stats(fixture):
+    from modules.analytics import RunAnalytics
+    analytics = RunAnalytics(warm_history(fixture))
+    analytics.stats(fixture.scenario)
+    return lambda: analytics.stats(fixture.scenario, 1000)
+
+
+@benchmark("stats_line_scan")
+def bench_stats_line_scan(fixture):
+    return lambda: line_scan_score(fixture.sample_file)
+
+
+@benchmark("parse_stats_summary")
+def bench_parse_stats_summary(fixture):
+    from modules.kovaaks_utils import parse_stats_summary
+    return lambda: parse_stats_summary(fixture.sample_file)
+
+
+@benchmark("stats_line_scan_large")
+def bench_stats_line_scan_large(fixture):
+    return lambda: line_scan_score(fixture.large_sample_file)
+
+
+@benchmark("parse_stats_summary_large")
+def bench_parse_stats_summary_large(fixture):
+    from modules.kovaaks_utils import parse_stats_summary
+    return lambda: parse_stats_summary(fixture.large_sample_file)
+
+
+@benchmark("extract_scenario_name")
+def bench_extract_scenario_name(fixture):
+    from modules.kovaaks_utils import extract_scenario_name
+    return lambda: extract_scenario_name(fixture.session_path)
+
+
+def read_session_bytes(fixture):
+    with open(fixture.session_path, 'rb') as file:
+        return file.read()
+
+
+@benchmark("session_name_byte_scan")
+def bench_session_name_byte_scan(fixture):
+    from modules.kovaaks_utils import _scan_scenario_name
+    data = read_session_bytes(fixture)
+    return lambda: _scan_scenario_name(data)
+
+
+@benchmark("session_name_gvas")
+def bench_session_name_gvas(fixture):
+    from modules.gvas import parse_gvas, scenario_name_from_gvas
+    data = read_session_bytes(fixture)
+    return lambda: scenario_name_from_gvas(parse_gvas(data))
+
+
+@benchmark("get_current_scenario")
+def bench_get_current_scenario(fixture):
+    os.environ["LOCALAPPDATA"] = fixture.local_app_data
+    from modules import kovaaks_utils
+    kovaaks_utils._session_reader = None
+    return kovaaks_utils.get_current_scenario
+
+
+class FakeProcess:
+    def __init__(self, name):
+        self.info = {"name": name}
+
+    def is_running(self):
+        return True
+
+
+def fake_process_finder(size=600):
+    table = [FakeProcess(f"process{pid}.exe") for pid in range(size)]
+    table.append(FakeProcess("FPSAimTrainer.exe"))
+
+    def find():
+        for process in table:
+            if "FPSAimTrainer.exe" in process.info["name"]:
+                return process
+        return None
+    return find
+
+
+@benchmark("process_full_scan")
+def bench_process_full_scan(fixture):
+    return fake_process_finder()
+
+
+@benchmark("process_detector_cached")
+def bench_process_detector_cached(fixture):
+    from modules.process_detector import ProcessDetector
+    detector = ProcessDetector(finder=fake_process_finder())
+    detector.is_running()
+    return detector.is_running
+
+
+@benchmark("fetch_all_pages")
+def bench_fetch_all_pages(fixture):
+    from benchmarks.stub_server import StubWebapp
+    from modules.online_api import OnlineScoreAPI
+    entries = generators.total_play_entries(2000)
+    server = StubWebapp(users={"bench": entries}, latency=0.005)
+    server.__enter__()
+    fixture.cleanup.append(server.__exit__)
+    api = OnlineScoreAPI(base_url=server.base_url)
+    return lambda: api.fetch_all_pages("bench")
+
+
+def friends_api(fixture, friend_count=8):
+    from benchmarks.stub_server import StubWebapp
+    from modules.online_api import OnlineScoreAPI
+    from modules.score_cache import ScoreCache
+    users = {f"friend{index}": generators.total_play_entries(500, seed=index) for index in range(friend_count)}
+    server = StubWebapp(users=users, latency=0.005)
+    server.__enter__()
+    fixture.cleanup.append(server.__exit__)
+    api = OnlineScoreAPI(base_url=server.base_url)
+    api.cache = ScoreCache(os.path.join(fixture.root, "scores_cache.json"))
+    api.leaderboards.path = os.path.join(fixture.root, "leaderboards.json")
+    return api, list(users)
+
+
+@benchmark("fetch_friends_scores")
+def bench_fetch_friends_scores(fixture):
+    api, friends = friends_api(fixture)
+
+    def fetch():
+        for friend in friends:
+            api.cache.remove(friend)
+        api.fetch_friends_scores(friends)
+    return fetch
+
+
+@benchmark("best_friend_score")
+def bench_best_friend_score(fixture):
+    api, friends = friends_api(fixture)
+    api.fetch_friends_scores(friends)
+    scenario = next(iter(api.cache.get(friends[0]).scores))
+    return lambda: api.best_friend_score(friends, scenario)
+
+
+@benchmark("rank_lookup")
+def bench_rank_lookup(fixture):
+    from modules.leaderboard import make_rank
+    api, _ = friends_api(fixture, friend_count=0)
+    entries = generators.total_play_entries(500)
+    api.leaderboards.update_from_entries(entries)
+    scenario = entries[0]["scenarioName"]
+    api.leaderboards.ranks[("bench", scenario)] = (make_rank(entries[0]["rank"], 50000), time.time())
+    return lambda: api.get_rank("bench", scenario)
+
+
+@benchmark("build_presence")
+def bench_build_presence(fixture):
+    from modules.discord_rpc import build_presence
+    return lambda: build_presence(fixture.scenario, time.time(), 1000.0, 900.0, fixture.installation_path)
+
+
+def name_index(count=30000):
+    from modules.name_index import ScenarioNameIndex
+    names = generators.scenario_names(count, seed=21)
+    return ScenarioNameIndex(names), names
+
+
+@benchmark("scenario_name_match")
+def bench_scenario_name_match(fixture):
+    index, names = name_index()
+    queries = [name[:-3] + name[-2:] + "x" for name in names[::len(names) // 50]]
+
+    def run():
+        index.memo.clear()
+        for query in queries:
+            index.match(query)
+    return run
+
+
+@benchmark("scenario_name_match_memo")
+def bench_scenario_name_match_memo(fixture):
+    index, names = name_index()
+    query = names[-1].upper() + " - Copy"
+    index.match(query)
+    return lambda: index.match(query)
+
+
+def time_callable(func, repeat, number):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - start) / number)
+    return {
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "max": max(samples),
+        "repeat": repeat,
+        "number": number
+    }
+
+
+def run_benchmarks(fixture, selected=None, repeat=5):
+    results = {}
+    fixture.cleanup = []
+    try:
+        for name, factory in BENCHMARKS:
+            if selected and name not in selected:
+                continue
+            try:
+                func = factory(fixture)
+                func()
+                start = time.perf_counter()
+                func()
+                single = time.perf_counter() - start
+                number = max(1, min(1000, int(0.05 / single))) if single > 0 else 1000
+                results[name] = time_callable(func, repeat, number)
+            except Exception as e:
+                results[name] = {"error": f"{type(e).__name__}: {e}"}
+            print(format_result(name, results[name]))
+    finally:
+        for cleanup in fixture.cleanup:
+            cleanup()
+    return results
+
+
+def format_result(name, result):
+    if "error" in result:
+        return f"{name:<28} ERROR {result['error']}"
+    return f"{name:<28} median {result['median'] * 1000:10.3f} ms   min {result['min'] * 1000:10.3f} ms"
+
+
+def compare_to_baseline(results, baseline, tolerance):
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get("results", {}).get(name)
+        if not previous or "median" not in previous or "median" not in result:
+            continue
+        ratio = result["median"] / previous["median"] if previous["median"] else 1.0
+        status = "REGRESSION" if ratio > 1 + tolerance else "ok"
+        print(f"{name:<28} {ratio:6.2f}x baseline   {status}")
+        if status != "ok":
+            regressions.append(name)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark Kovaak RPC hot paths against synthetic data")
+    parser.add_argument("--files", type=int, default=1000, help="number of stats CSVs to generate")
+    parser.add_argument("--scenarios", type=int, default=None, help="number of distinct scenarios")
+    parser.add_argument("--data-dir", default=None, help="reuse generated fixtures from this directory")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", nargs="*", default=None, help="run only the named benchmarks")
+    parser.add_argument("--output", default=RESULTS_FILE)
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown before failing")
+    args = parser.parse_args(argv)
+
+    root = args.data_dir or tempfile.mkdtemp(prefix="kovaaks_bench_")
+    os.makedirs(root, exist_ok=True)
+    print(f"Generating fixtures in {root} ({args.files} files)")
+    fixture = Fixture(root, args.files, args.scenarios)
+
+    results = run_benchmarks(fixture, args.only, args.repeat)
+    report = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "files": args.files,
+        "results": results
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("files") != args.files:
+            print(f"Baseline was recorded with {baseline.get('files')} files, skipping comparison")
+            return 0
+        if compare_to_baseline(results, baseline, args.tolerance):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
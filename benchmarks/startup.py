@@ -0,0 +1,100 @@
+import os
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TARGETS = {
+    "tray": "import modules.tray",
+    "engine": "import modules.engine",
+    "gui": "import modules.gui",
+}
+DEFERRED_MODULES = ("customtkinter", "tkinter", "requests", "pypresence", "modules.gui")
+DEFERRED_FOR = ("tray", "engine")
+
+
+def parse_importtime(output):
+    modules = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3:
+            continue
+        try:
+            modules.append((fields[2][1:].rstrip(), int(fields[0]), int(fields[1])))
+        except ValueError:
+            continue
+    return modules
+
+
+def measure(statement, repeat):
+    wall_times = []
+    modules = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", statement], cwd=ROOT,
+                                capture_output=True, text=True)
+        wall_times.append(time.perf_counter() - start)
+        if result.returncode != 0:
+            error = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "unknown error"
+            return None, [], error
+        modules = parse_importtime(result.stderr)
+    return wall_times, modules, None
+
+
+def baseline_interpreter(repeat):
+    wall_times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "pass"], cwd=ROOT, capture_output=True)
+        wall_times.append(time.perf_counter() - start)
+    return statistics.median(wall_times)
+
+
+def top_level(modules):
+    return [module for module in modules if not module[0].startswith(" ")]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure Kovaak RPC startup import cost")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="number of heaviest imports to list")
+    parser.add_argument("--target", nargs="*", default=list(TARGETS), choices=list(TARGETS))
+    args = parser.parse_args(argv)
+
+    interpreter = baseline_interpreter(args.repeat)
+    print(f"{'interpreter':<10} median {interpreter * 1000:8.1f} ms wall clock")
+
+    failures = 0
+    for target in args.target:
+        wall_times, modules, error = measure(TARGETS[target], args.repeat)
+        if error:
+            print(f"{target:<10} could not import: {error}")
+            failures += 1
+            continue
+
+        imported = {name.strip() for name, _, _ in modules}
+        total_us = sum(cumulative_us for _, _, cumulative_us in top_level(modules))
+        median = statistics.median(wall_times)
+        print(f"{target:<10} median {median * 1000:8.1f} ms wall clock "
+              f"({(median - interpreter) * 1000:.1f} ms over interpreter), "
+              f"{total_us / 1000:.1f} ms in imports, {len(imported)} modules")
+
+        heaviest = sorted(top_level(modules), key=lambda item: item[2], reverse=True)[:args.top]
+        for name, _, cumulative_us in heaviest:
+            print(f"    {cumulative_us / 1000:8.1f} ms  {name}")
+
+        if target in DEFERRED_FOR:
+            eager = [name for name in DEFERRED_MODULES if name in imported]
+            if eager:
+                print(f"    imported eagerly but should be deferred: {', '.join(eager)}")
+                failures += 1
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+
+class StubWebappHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        parsed = urlparse(self.path)
+        params = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+        route = parsed.path[len(server.prefix):] if parsed.path.startswith(server.prefix) else None
+        server.record(route, params)
+
+        if server.latency:
+            time.sleep(server.latency)
+        if server.should_fail():
+            self._send(429, {"error": "Too Many Requests"})
+            return
+
+        if route == "/user/scenario/total-play":
+            if int(params.get("page", 0)) in server.fail_pages:
+                self._send(404, {"error": "Not Found"})
+                return
+            self._send(200, server.total_play(params))
+        elif route == "/leaderboard/scores/global":
+            self._send(200, server.leaderboard(params))
+        else:
+            self._send(404, {"error": "Not Found"})
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class StubWebapp(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, users=None, latency=0.0, fail_every=0, prefix="/webapp-backend", leaderboard_size=50000,
+                 fail_pages=()):
+        super().__init__(("127.0.0.1", 0), StubWebappHandler)
+        self.users = users or {}
+        self.latency = latency
+        self.fail_every = fail_every
+        self.fail_pages = set(fail_pages)
+        self.prefix = prefix
+        self.leaderboard_size = leaderboard_size
+        self.requests = []
+        self.lock = threading.Lock()
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}{self.prefix}"
+
+    def record(self, route, params):
+        with self.lock:
+            self.requests.append((route, params))
+
+    def should_fail(self):
+        if not self.fail_every:
+            return False
+        with self.lock:
+            return len(self.requests) % self.fail_every == 0
+
+    def total_play(self, params):
+        entries = self.users.get(params.get("username"), [])
+        page = int(params.get("page", 0))
+        per_page = int(params.get("max", 100))
+        data = entries[page * per_page:(page + 1) * per_page]
+        return {"page": page, "max": per_page, "total": len(entries), "data": data}
+
+    def leaderboard(self, params):
+        leaderboard_id = int(params.get("leaderboardId", 0))
+        per_page = int(params.get("max", 10))
+        search = params.get("usernameSearch", "").lower()
+        data = []
+        for username, entries in self.users.items():
+            if search and search not in username.lower():
+                continue
+            for entry in entries:
+                if entry.get("leaderboardId") == leaderboard_id:
+                    data.append({"rank": entry["rank"], "score": entry["score"],
+                                 "webappUsername": username, "steamAccountName": username})
+        data.sort(key=lambda entry: entry["rank"])
+        return {"page": 0, "max": per_page, "total": self.leaderboard_size, "data": data[:per_page]}
+
+    def __enter__(self):
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+        self.server_close()
@@ -1,10 +1,12 @@
 import threading
+import multiprocessing
 from modules.config import load_settings
-from modules.gui import MainWindow
+from modules.log import setup_logging
 from modules.tray import SystemTrayApp
 
 
 def main():
+    setup_logging()
     settings = load_settings()
 
     if settings.get("start_in_tray", False):
@@ -19,6 +21,7 @@ def main():
         tray_thread = threading.Thread(target=run_tray, daemon=True)
         tray_thread.start()
 
+        from modules.gui import MainWindow
         main_window = MainWindow(settings, tray_app)
         main_window.mainloop()
 
@@ -26,4 +29,5 @@ def main():
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
@@ -0,0 +1,118 @@
+import time
+from collections import namedtuple
+
+from modules.metrics import metrics
+from modules.log import get_logger
+
+logger = get_logger("analytics")
+
+INITIAL_CAPACITY = 64
+RECENT_RUNS = 10
+TREND_WINDOW = 7 * 24 * 60 * 60
+
+RunStats = namedtuple('RunStats', ['runs', 'top_percent', 'recent_runs', 'recent_average', 'recent_accuracy',
+                                   'weekly_change'])
+
+
+class ScenarioSeries:
+    def __init__(self, capacity=INITIAL_CAPACITY):
+        import numpy as np
+
+        self.timestamps = np.empty(capacity)
+        self.scores = np.empty(capacity)
+        self.accuracy = np.empty(capacity)
+        self.count = 0
+        self.last_rowid = 0
+
+    def __len__(self):
+        return self.count
+
+    def extend(self, rows):
+        import numpy as np
+
+        if not rows:
+            return
+        block = np.array([row[1:] for row in rows], dtype=np.float64)
+        end = self.count + len(block)
+        if end > len(self.scores):
+            self._grow(end)
+
+        start = max(0, self.count - 1)
+        self.timestamps[self.count:end] = block[:, 0]
+        self.scores[self.count:end] = block[:, 1]
+        self.accuracy[self.count:end] = block[:, 2]
+        self.count = end
+        self.last_rowid = rows[-1][0]
+
+        if np.any(np.diff(self.timestamps[start:end]) < 0):
+            order = np.argsort(self.timestamps[:end], kind='stable')
+            for array in (self.timestamps, self.scores, self.accuracy):
+                array[:end] = array[:end][order]
+
+    def _grow(self, needed):
+        import numpy as np
+
+        capacity = max(len(self.scores) * 2, needed)
+        for name in ('timestamps', 'scores', 'accuracy'):
+            array = np.empty(capacity)
+            array[:self.count] = getattr(self, name)[:self.count]
+            setattr(self, name, array)
+
+    def top_percent(self, score):
+        import numpy as np
+
+        if not self.count or score is None:
+            return None
+        return float(np.count_nonzero(self.scores[:self.count] >= score) / self.count * 100)
+
+    def recent(self, runs=RECENT_RUNS):
+        import numpy as np
+
+        start = max(0, self.count - runs)
+        scores = self.scores[start:self.count]
+        accuracy = self.accuracy[start:self.count]
+        accuracy = accuracy[~np.isnan(accuracy)]
+        return (len(scores), float(scores.mean()) if len(scores) else None,
+                float(accuracy.mean()) if len(accuracy) else None)
+
+    def weekly_change(self, now=None, window=TREND_WINDOW):
+        now = now or time.time()
+        timestamps = self.timestamps[:self.count]
+        last_week, this_week = timestamps.searchsorted([now - 2 * window, now - window])
+        previous = self.scores[last_week:this_week]
+        current = self.scores[this_week:self.count]
+        if not len(previous) or not len(current):
+            return None
+        baseline = previous.mean()
+        if baseline <= 0:
+            return None
+        return float((current.mean() - baseline) / baseline * 100)
+
+
+class RunAnalytics:
+    def __init__(self, run_history):
+        self.run_history = run_history
+        self.series = {}
+
+    def _load(self, scenario_name):
+        series = self.series.get(scenario_name)
+        if series is None:
+            series = self.series[scenario_name] = ScenarioSeries()
+        series.extend(self.run_history.runs_since(scenario_name, series.last_rowid))
+
+        if len(series) != self.run_history.run_count(scenario_name):
+            logger.debug("Rebuilding run arrays for '%s'", scenario_name)
+            series = self.series[scenario_name] = ScenarioSeries()
+            series.extend(self.run_history.runs_since(scenario_name, 0))
+        return series
+
+    def stats(self, scenario_name, score=None, now=None):
+        if not scenario_name:
+            return None
+        with metrics.timer("run_stats"):
+            series = self._load(scenario_name)
+            if not len(series):
+                return None
+            recent_runs, recent_average, recent_accuracy = series.recent()
+            return RunStats(len(series), series.top_percent(score), recent_runs, recent_average, recent_accuracy,
+                            series.weekly_change(now))
@@ -0,0 +1,98 @@
+import os
+from collections import deque
+
+from modules.kovaaks_utils import scenario_from_filename
+from modules.log import get_logger
+
+logger = get_logger("checked_runs")
+
+CHECKED_RUNS_FILE = "checked_files.log"
+RECENT_WINDOW = 256
+COMPACT_THRESHOLD = 4096
+
+
+class CheckedRuns:
+    def __init__(self, log_file=CHECKED_RUNS_FILE, recent_window=RECENT_WINDOW):
+        self.log_file = log_file
+        self.watermarks = {}
+        self.recent = set()
+        self.recent_order = deque()
+        self.recent_window = recent_window
+        self.log_lines = 0
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.log_file):
+            return
+        try:
+            with open(self.log_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    mtime, _, file_name = line.rstrip("\n").partition("\t")
+                    if file_name:
+                        self._remember(file_name, int(mtime))
+                        self.log_lines += 1
+        except Exception as e:
+            logger.error("Error loading checked runs: %s", e)
+
+    def is_checked(self, file_name, mtime):
+        if file_name in self.recent:
+            return True
+        watermark = self.watermarks.get(scenario_from_filename(file_name))
+        return watermark is not None and (mtime, file_name) <= watermark
+
+    def add(self, file_name, mtime):
+        self.add_many([(file_name, mtime)])
+
+    def add_many(self, runs):
+        lines = []
+        for file_name, mtime in runs:
+            if self.is_checked(file_name, mtime):
+                continue
+            self._remember(file_name, mtime)
+            lines.append(f"{mtime}\t{file_name}\n")
+        if not lines:
+            return
+        try:
+            with open(self.log_file, 'a', encoding='utf-8') as f:
+                f.writelines(lines)
+            self.log_lines += len(lines)
+        except Exception as e:
+            logger.error("Error saving checked runs: %s", e)
+        if self.log_lines > max(COMPACT_THRESHOLD, 2 * (len(self.watermarks) + self.recent_window)):
+            self.compact()
+
+    def migrate(self, file_names, stats_directory):
+        runs = []
+        for file_name in file_names:
+            try:
+                runs.append((file_name, os.stat(os.path.join(stats_directory, file_name)).st_mtime_ns))
+            except OSError:
+                continue
+        self.add_many(runs)
+
+    def compact(self):
+        lines = [f"{mtime}\t{file_name}\n" for mtime, file_name in self.watermarks.values()]
+        lines.extend(f"{mtime}\t{file_name}\n" for file_name, mtime in self.recent_order)
+        temp_path = self.log_file + ".tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.writelines(lines)
+            os.replace(temp_path, self.log_file)
+            self.log_lines = len(lines)
+        except Exception as e:
+            logger.error("Error compacting checked runs: %s", e)
+
+    def _remember(self, file_name, mtime):
+        scenario = scenario_from_filename(file_name)
+        if scenario is not None:
+            watermark = self.watermarks.get(scenario)
+            if watermark is None or (mtime, file_name) > watermark:
+                self.watermarks[scenario] = (mtime, file_name)
+
+        if file_name in self.recent:
+            return
+        self.recent.add(file_name)
+        self.recent_order.append((file_name, mtime))
+        if len(self.recent_order) > self.recent_window:
+            old_name, _ = self.recent_order.popleft()
+            self.recent.discard(old_name)
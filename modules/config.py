@@ -1,10 +1,10 @@
 import os
 import json
 import sys
-import winreg
-import customtkinter as ctk
-from tkinter import filedialog
-import subprocess
+
+from modules.log import get_logger
+
+logger = get_logger("config")
 
 SETTINGS_FILE = "settings.json"
 CONFIG_FILE = "checked_files.json"
@@ -17,7 +17,8 @@ DEFAULT_SETTINGS = {
     "webapp_username": "",
     "show_online_scores": False,
     "start_in_tray": False,
-    "online_only_scenarios": False
+    "online_only_scenarios": False,
+    "friends": []
 }
 
 
@@ -39,7 +40,7 @@ def load_settings():
                         settings[key] = value
                 return settings
         except Exception as e:
-            print(f"Error loading settings: {e}")
+            logger.error("Error loading settings: %s", e)
     return DEFAULT_SETTINGS.copy()
 
 
@@ -48,7 +49,7 @@ def save_settings(settings):
         with open(SETTINGS_FILE, "w") as file:
             json.dump(settings, file, indent=4)
     except Exception as e:
-        print(f"Error saving settings: {e}")
+        logger.error("Error saving settings: %s", e)
 
 
 def load_or_create_config():
@@ -61,7 +62,7 @@ def load_or_create_config():
                 return config
         except:
             pass
-    return {"checked_files": [], "installation_path": None}
+    return {"installation_path": None}
 
 
 def save_config(config):
@@ -71,17 +72,21 @@ def save_config(config):
 
 def get_steam_path_from_registry():
     try:
+        import winreg
         with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, r"SOFTWARE\WOW6432Node\Valve\Steam") as key:
             steam_path = winreg.QueryValueEx(key, "InstallPath")[0]
             candidate = os.path.join(steam_path, "steamapps", "common", "FPSAimTrainer", "FPSAimTrainer")
             if os.path.exists(os.path.join(candidate, "stats")):
                 return candidate
     except Exception as e:
-        print(f"Error detecting Steam path: {e}")
+        logger.error("Error detecting Steam path: %s", e)
     return None
 
 
 def prompt_for_installation_folder():
+    import customtkinter as ctk
+    from tkinter import filedialog
+
     root = ctk.CTk()
     root.withdraw()
     folder_path = filedialog.askdirectory(title="Select FPSAimTrainer Installation Folder")
@@ -96,7 +101,7 @@ def initialize_installation_path():
         if not detected:
             detected = prompt_for_installation_folder()
             if not detected:
-                print("No installation folder selected. Using default behavior.")
+                logger.info("No installation folder selected. Using default behavior.")
                 return None, settings
         settings["installation_path"] = detected
         save_settings(settings)
@@ -0,0 +1,175 @@
+import os
+import hmac
+import json
+import socket
+import asyncio
+import secrets
+
+from modules.log import get_logger, ring_buffer
+from modules.metrics import metrics
+
+logger = get_logger("control")
+
+CONTROL_HOST = "127.0.0.1"
+CONTROL_PORT = 47821
+MAX_COMMAND_BYTES = 64 * 1024
+CONTROL_TOKEN_FILE = "control_token"
+
+
+def read_control_token(path=CONTROL_TOKEN_FILE):
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read().strip()
+
+
+def load_control_token(path=CONTROL_TOKEN_FILE):
+    try:
+        token = read_control_token(path)
+        if token:
+            return token
+    except OSError:
+        pass
+    token = secrets.token_hex(32)
+    temp_path = path + ".tmp"
+    fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(token)
+    os.replace(temp_path, path)
+    return token
+
+
+class ControlServer:
+    def __init__(self, engine, host=CONTROL_HOST, port=CONTROL_PORT, on_quit=None, save_settings=None,
+                 token_file=CONTROL_TOKEN_FILE):
+        self.engine = engine
+        self.token = load_control_token(token_file)
+        self.host = host
+        self.port = port
+        self.on_quit = on_quit
+        self.save_settings = save_settings
+        self.server = None
+        self.commands = {
+            "status": self.status,
+            "start": self.start_rpc,
+            "stop": self.stop_rpc,
+            "cancel_ingest": self.cancel_ingest,
+            "settings": self.update_settings,
+            "metrics": self.show_metrics,
+            "logs": self.show_logs,
+            "quit": self.quit,
+        }
+
+    def start(self):
+        future = asyncio.run_coroutine_threadsafe(self._start(), self.engine.loop)
+        return future.result(timeout=5)
+
+    def stop(self):
+        if self.server and self.engine.loop and not self.engine.loop.is_closed():
+            future = asyncio.run_coroutine_threadsafe(self._stop(), self.engine.loop)
+            try:
+                future.result(timeout=5)
+            except Exception as e:
+                logger.error("Error stopping control server: %s", e)
+
+    async def _start(self):
+        self.server = await asyncio.start_server(self._handle_client, self.host, self.port, limit=MAX_COMMAND_BYTES)
+        self.port = self.server.sockets[0].getsockname()[1]
+        logger.info("Control server listening on %s:%s", self.host, self.port)
+        return self.port
+
+    async def _stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+        self.server = None
+
+    async def _handle_client(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                response = self.handle_command(line)
+                if response is None:
+                    logger.warning("Closing control connection after an invalid request")
+                    break
+                writer.write(json.dumps(response).encode("utf-8") + b"\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError) as e:
+            logger.warning("Control client error: %s", e)
+        finally:
+            writer.close()
+
+    def handle_command(self, line):
+        try:
+            request = json.loads(line)
+        except ValueError:
+            return None
+        if not isinstance(request, dict):
+            return None
+        token = request.get("token")
+        if not isinstance(token, str) or not hmac.compare_digest(token.encode("utf-8"), self.token.encode("utf-8")):
+            return None
+
+        handler = self.commands.get(request.get("command"))
+        if handler is None:
+            return {"ok": False, "error": f"Unknown command: {request.get('command')}",
+                    "commands": sorted(self.commands)}
+        try:
+            result = handler(request)
+        except Exception as e:
+            logger.error("Error handling control command %s: %s", request.get("command"), e)
+            return {"ok": False, "error": str(e)}
+        response = {"ok": True}
+        if result is not None:
+            response["result"] = result
+        return response
+
+    def status(self, request):
+        engine = self.engine
+        return {
+            "state": engine.state.name,
+            "rpc_running": engine.rpc_running,
+            "scenario": engine.current_scenario,
+            "local_highscore": engine.local_highscore,
+            "session_highscore": engine.session_highscore,
+            "installation_path": engine.installation_path,
+            "ingest": engine.ingest_progress._asdict() if engine.ingest_progress else None,
+        }
+
+    def start_rpc(self, request):
+        self.engine.start_rpc()
+
+    def stop_rpc(self, request):
+        self.engine.stop_rpc()
+
+    def cancel_ingest(self, request):
+        self.engine.cancel_ingest()
+
+    def update_settings(self, request):
+        changes = request.get("settings")
+        if not isinstance(changes, dict):
+            raise ValueError("'settings' must be an object")
+        settings = dict(self.engine.settings)
+        settings.update(changes)
+        if self.save_settings:
+            self.save_settings(settings)
+        self.engine.update_settings(settings)
+        return settings
+
+    def show_metrics(self, request):
+        return metrics.snapshot()
+
+    def show_logs(self, request):
+        return ring_buffer.lines()[-int(request.get("limit", 50)):]
+
+    def quit(self, request):
+        if self.on_quit:
+            self.engine.loop.call_soon(self.on_quit)
+
+
+def send_command(command, host=CONTROL_HOST, port=CONTROL_PORT, timeout=5, token_file=CONTROL_TOKEN_FILE,
+                 **fields):
+    request = dict(fields, command=command, token=read_control_token(token_file))
+    with socket.create_connection((host, port), timeout=timeout) as sock:
+        sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        with sock.makefile("rb") as response:
+            return json.loads(response.readline())
@@ -1,76 +1,184 @@
-import os
-import json
-import codecs
-from pypresence import Presence
+import time
+import threading
+from collections import deque
 
-CLIENT_ID = '1321990331083784202'
-
-
-def get_playlist_share_code(installation_path):
-    playlist_file = os.path.join(installation_path, "Saved", "SaveGames", "PlaylistInProgress.json")
-    if not os.path.exists(playlist_file):
-        return None
-
-    try:
-        with open(playlist_file, 'rb') as f:
-            raw = f.read()
-        raw  = str(raw)
-        raw = raw.split('"shareCode": "')[1].split(r'",\r\n\t"version": ')[0]
-        return raw
-
-    except (json.JSONDecodeError, Exception) as e:
-        print(f"Error reading playlist file: {e}")
-        return None
+from modules.log import get_logger
+from modules.playlist import load_playlist
 
+logger = get_logger("discord_rpc")
 
-def update_presence(rpc, scenario_name, start_time, highscore, session_highscore, online_score, installation_path):
-    if not rpc:
-        print("RPC object is None, cannot update presence")
+CLIENT_ID = '1321990331083784202'
+RATE_LIMIT_UPDATES = 5
+RATE_LIMIT_WINDOW = 20
+COALESCE_DELAY = 0.25
+MAX_TEXT_LENGTH = 128
+
+def _thread_timer(delay, callback):
+    timer = threading.Timer(delay, callback)
+    timer.daemon = True
+    timer.start()
+    return timer
+
+
+class PresenceManager:
+    def __init__(self, rpc, schedule=_thread_timer):
+        self.rpc = rpc
+        self.schedule = schedule
+        self.last_payload = None
+        self.pending = None
+        self.pending_urgent = False
+        self.sent_times = deque()
+        self.timer = None
+        self.lock = threading.Lock()
+
+    def submit(self, payload, urgent=False):
+        with self.lock:
+            if payload == self.last_payload:
+                self.pending = None
+                self.pending_urgent = False
+                return
+            self.pending = payload
+            self.pending_urgent = self.pending_urgent or urgent
+            delay = self._delay()
+            if self.pending_urgent:
+                self._cancel_timer()
+                if delay > 0:
+                    self.timer = self.schedule(delay, self.flush)
+                    return
+            else:
+                if self.timer is None:
+                    self.timer = self.schedule(max(delay, COALESCE_DELAY), self.flush)
+                return
+        self.flush()
+
+    def flush(self):
+        with self.lock:
+            self.timer = None
+            payload = self.pending
+            if payload is None:
+                return False
+            delay = self._delay()
+            if delay > 0:
+                self.timer = self.schedule(delay, self.flush)
+                return False
+            self.pending = None
+            self.pending_urgent = False
+            self.sent_times.append(time.monotonic())
+            try:
+                result = self.rpc.update(**payload)
+                self.last_payload = payload
+            except Exception as e:
+                logger.error("Error updating Rich Presence: %s", e)
+                return False
+        if hasattr(result, "add_done_callback"):
+            result.add_done_callback(lambda future: self._sent(payload, future))
+        return True
+
+    def _sent(self, payload, future):
+        if future.cancelled() or future.exception() is not None:
+            with self.lock:
+                if self.last_payload is payload:
+                    self.last_payload = None
+
+    def clear(self):
+        with self.lock:
+            self._cancel_timer()
+            self.pending = None
+            self.last_payload = None
+
+    def _cancel_timer(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+
+    def _delay(self):
+        now = time.monotonic()
+        while self.sent_times and now - self.sent_times[0] >= RATE_LIMIT_WINDOW:
+            self.sent_times.popleft()
+        limit = RATE_LIMIT_UPDATES if self.pending_urgent else RATE_LIMIT_UPDATES - 1
+        if len(self.sent_times) < limit:
+            return 0
+        return RATE_LIMIT_WINDOW - (now - self.sent_times[len(self.sent_times) - limit])
+
+
+def format_run_stats(run_stats):
+    parts = []
+    if run_stats.top_percent is not None:
+        parts.append(f"Top {run_stats.top_percent:.1f}% run")
+    if run_stats.recent_average is not None and run_stats.recent_runs > 1:
+        parts.append(f"avg last {run_stats.recent_runs}: {run_stats.recent_average:.0f}")
+    if run_stats.weekly_change is not None:
+        parts.append(f"{run_stats.weekly_change:+.1f}% vs last week")
+    return parts
+
+
+def build_presence(scenario_name, start_time, highscore, session_highscore, installation_path, friend_score=None,
+                   rank=None, run_stats=None):
+    playlist = load_playlist(installation_path)
+    share_code = playlist.share_code if playlist else None
+
+    details_text = f"Playing: {scenario_name}"
+
+
+    state_text = f"Highscore: {highscore}"
+    if friend_score:
+        friend_name, score = friend_score
+        state_text += f" | {friend_name}: {score}"
+
+    buttons = []
+    if share_code:
+        buttons.append({
+            "label": "Play Playlist",
+            "url": f"steam://run/824270/?action=jump-to-playlist;sharecode={share_code}"
+        })
+    else:
+        encoded_scenario = scenario_name.replace(' ', '%20').replace('&', '%26')
+        buttons.append({
+            "label": "View Scenario",
+            "url": f"steam://run/824270/?action=jump-to-scenario;name={encoded_scenario}"
+        })
+
+
+    large_text = f"Session Best: {session_highscore}" if session_highscore > 0 else "No session plays yet"
+    if rank:
+        large_text += f" | Rank #{rank.rank} (Top {rank.top_percent:.1f}%)"
+    if run_stats:
+        large_text = " | ".join([large_text] + format_run_stats(run_stats))
+    if len(large_text) > MAX_TEXT_LENGTH:
+        large_text = large_text[:MAX_TEXT_LENGTH - 3] + "..."
+
+    presence_data = {
+        "details": details_text,
+        "state": state_text,
+        "start": int(start_time) if start_time else None,
+        "large_image": "kovaak_image",
+        "large_text": large_text,
+        "small_text": large_text,
+    }
+
+    if buttons:
+        presence_data["buttons"] = buttons
+
+    return presence_data
+
+
+def update_presence(presence_manager, scenario_name, start_time, highscore, session_highscore, online_score,
+                    installation_path, urgent=False, friend_score=None, rank=None, run_stats=None):
+    if not presence_manager:
+        logger.warning("Presence manager is None, cannot update presence")
         return
 
     try:
         if not scenario_name or scenario_name == "Unknown Scenario":
-            print("Invalid scenario name, skipping presence update")
+            logger.debug("Invalid scenario name, skipping presence update")
             return
 
-        share_code = get_playlist_share_code(installation_path)
-
-        details_text = f"Playing: {scenario_name}"
-
-
-        state_text = f"Highscore: {highscore}"
-
-        buttons = []
-        if share_code:
-            buttons.append({
-                "label": "Play Playlist",
-                "url": f"steam://run/824270/?action=jump-to-playlist;sharecode={share_code}"
-            })
-        else:
-            encoded_scenario = scenario_name.replace(' ', '%20').replace('&', '%26')
-            buttons.append({
-                "label": "View Scenario",
-                "url": f"steam://run/824270/?action=jump-to-scenario;name={encoded_scenario}"
-            })
-
-
-        large_text = f"Session Best: {session_highscore}" if session_highscore > 0 else "No session plays yet"
-
-        presence_data = {
-            "details": details_text,
-            "state": state_text,
-            "start": int(start_time) if start_time else None,
-            "large_image": "kovaak_image",
-            "large_text": large_text,
-            "small_text": large_text,
-        }
-
-        if buttons:
-            presence_data["buttons"] = buttons
+        presence_data = build_presence(scenario_name, start_time, highscore, session_highscore, installation_path,
+                                       friend_score, rank, run_stats)
 
         score_type = "online" if online_score is not None else "local"
-        print(f"Updating presence for: {scenario_name} (using {score_type} highscore: {highscore})")
-        rpc.update(**presence_data)
+        logger.debug("Updating presence for: %s (using %s highscore: %s)", scenario_name, score_type, highscore)
+        presence_manager.submit(presence_data, urgent)
 
     except Exception as e:
-        print(f"Error updating Rich Presence: {e}")
\ No newline at end of file
+        logger.error("Error updating Rich Presence: %s", e)
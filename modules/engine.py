@@ -0,0 +1,626 @@
+import os
+import sys
+import json
+import time
+import signal
+import asyncio
+import argparse
+import threading
+from enum import Enum
+from concurrent.futures import ThreadPoolExecutor
+
+from modules.kovaaks_utils import SessionReader
+from modules.process_detector import ProcessDetector
+from modules.run_history import RunHistory
+from modules.analytics import RunAnalytics
+from modules.checked_runs import CheckedRuns
+from modules.stats_watcher import create_stats_watcher
+from modules.online_api import OnlineScoreAPI
+from modules.discord_rpc import CLIENT_ID, PresenceManager, update_presence
+from modules.playlist import load_playlist
+from modules.metrics import metrics
+from modules.log import get_logger, setup_logging, shutdown_logging
+from modules.control import CONTROL_PORT, ControlServer, send_command
+
+logger = get_logger("engine")
+
+
+class EngineState(Enum):
+    GAME_DOWN = "Game not running"
+    GAME_UP = "Game running"
+    RPC_CONNECTED = "RPC connected"
+    IN_SCENARIO = "In scenario"
+
+
+def create_presence(client_id):
+    from pypresence import Presence
+    return Presence(client_id)
+
+
+class RpcClient:
+    def __init__(self, presence_factory):
+        self.presence_factory = presence_factory
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.rpc = None
+
+    def connect(self):
+        return self.executor.submit(self._connect)
+
+    def update(self, **payload):
+        return self.executor.submit(self._update, payload)
+
+    def close(self):
+        future = self.executor.submit(self._close)
+        self.executor.shutdown(wait=False)
+        return future
+
+    def _connect(self):
+        rpc = self.presence_factory(CLIENT_ID)
+        rpc.connect()
+        self.rpc = rpc
+
+    def _update(self, payload):
+        try:
+            with metrics.timer("rpc_update"):
+                self.rpc.update(**payload)
+        except Exception as e:
+            logger.error("Error updating Rich Presence: %s", e)
+            raise
+
+    def _close(self):
+        if self.rpc:
+            self.rpc.close()
+            self.rpc = None
+
+
+class Engine:
+    PROCESS_INTERVAL = 5
+    SCENARIO_INTERVAL = 2
+    REFRESH_INTERVAL = 10
+    PLAYLIST_PREFETCH = 3
+
+    def __init__(self, settings, installation_path, legacy_checked_files=None, presence_factory=create_presence,
+                 process_detector=None, session_reader=None, online_api=None):
+        self.settings = dict(settings)
+        self.installation_path = installation_path
+        self.presence_factory = presence_factory
+        self.process_detector = process_detector or ProcessDetector()
+        self.session_reader = session_reader or SessionReader()
+        self.online_api = online_api or OnlineScoreAPI()
+        self.run_history = RunHistory(self.stats_directory) if installation_path else None
+        self.analytics = RunAnalytics(self.run_history) if self.run_history else None
+        self.checked_runs = CheckedRuns()
+        if legacy_checked_files and installation_path:
+            self.checked_runs.migrate(legacy_checked_files, self.stats_directory)
+
+        self.state = EngineState.GAME_DOWN
+        self.listeners = []
+        self.loop = None
+        self.thread = None
+        self.io_executor = ThreadPoolExecutor(max_workers=1)
+        self.ingest_executor = ThreadPoolExecutor(max_workers=1)
+        self.ingest_task = None
+        self.process_task = None
+        self.scenario_task = None
+
+        self.rpc = None
+        self.presence_manager = None
+        self.rpc_wanted = False
+        self.connecting = False
+        self.stats_watcher = None
+        self.start_time = None
+        self.current_scenario = None
+        self.local_highscore = 0
+        self.session_highscore = 0
+        self.scenario_played = False
+        self.urgent_update = False
+        self.last_presence_refresh = 0
+        self.online_scores = {}
+        self.online_scenario_cache = {}
+        self.ingest_progress = None
+        self.ingest_cancel = threading.Event()
+        self.warm_scores = {}
+
+        self.process_detector.subscribe(
+            on_start=lambda: self._call(self._on_game_started),
+            on_stop=lambda: self._call(self._on_game_stopped)
+        )
+
+    @property
+    def stats_directory(self):
+        return os.path.join(self.installation_path, "stats")
+
+    @property
+    def rpc_running(self):
+        return self.state in (EngineState.RPC_CONNECTED, EngineState.IN_SCENARIO)
+
+    def add_listener(self, callback):
+        self.listeners.append(callback)
+
+    def start(self):
+        if self.thread:
+            return
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self._run_loop, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        if not self.thread:
+            return
+        self.ingest_cancel.set()
+        try:
+            asyncio.run_coroutine_threadsafe(self._shutdown(), self.loop).result(timeout=5)
+        except Exception as e:
+            logger.error("Error stopping engine: %s", e)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout=1)
+        self.thread = None
+
+    def start_rpc(self):
+        self.ingest_cancel.clear()
+        self._call(self._request_rpc, True)
+
+    def stop_rpc(self):
+        self._call(self._request_rpc, False)
+
+    def update_settings(self, settings):
+        self._call(self._apply_settings, dict(settings))
+
+    def cancel_ingest(self):
+        self.ingest_cancel.set()
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self.process_task = self.loop.create_task(self._process_loop())
+        self.loop.run_forever()
+
+    def _call(self, func, *args):
+        if self.loop and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(func, *args)
+
+    async def _io(self, func, *args):
+        return await self.loop.run_in_executor(self.io_executor, func, *args)
+
+    def _set_state(self, state):
+        if state == self.state:
+            return
+        self.state = state
+        for listener in self.listeners:
+            try:
+                listener(state)
+            except Exception as e:
+                logger.error("Error in engine listener: %s", e)
+
+    async def _shutdown(self):
+        if self.process_task:
+            self.process_task.cancel()
+        if self.ingest_task:
+            self.ingest_task.cancel()
+        await self._disconnect_rpc(EngineState.GAME_DOWN)
+
+    async def _process_loop(self):
+        while True:
+            try:
+                await self._io(metrics.timed, "process_scan", self.process_detector.poll)
+            except Exception as e:
+                logger.error("Error checking Kovaak process: %s", e)
+            await asyncio.sleep(self.PROCESS_INTERVAL)
+
+    def _on_game_started(self):
+        self._set_state(EngineState.GAME_UP)
+        if not self.settings.get("open_manually", True):
+            self.rpc_wanted = True
+        if self.rpc_wanted:
+            self.loop.create_task(self._connect_rpc())
+
+    def _on_game_stopped(self):
+        if self.settings.get("open_manually", True):
+            self.rpc_wanted = False
+        self.loop.create_task(self._disconnect_rpc(EngineState.GAME_DOWN))
+
+    def _request_rpc(self, wanted):
+        self.rpc_wanted = wanted
+        if not wanted:
+            next_state = EngineState.GAME_UP if self.process_detector.running else EngineState.GAME_DOWN
+            self.loop.create_task(self._disconnect_rpc(next_state))
+        elif self.process_detector.running:
+            self.loop.create_task(self._connect_rpc())
+        else:
+            logger.info("Kovaak is not running, RPC will start when it opens")
+
+    def _apply_settings(self, new_settings):
+        old_username = self.settings.get("webapp_username")
+        old_show_online = self.settings.get("show_online_scores")
+        old_friends = self.settings.get("friends", [])
+
+        self.settings = dict(new_settings)
+        self.online_scenario_cache = {}
+        if (new_settings.get("webapp_username") and new_settings.get("show_online_scores") and
+                (new_settings.get("webapp_username") != old_username or not old_show_online)):
+            logger.info("Reloading online scores due to settings change...")
+            self.loop.create_task(self._load_online_scores())
+        if new_settings.get("friends", []) != old_friends:
+            self.loop.create_task(self._refresh_friends())
+        if not new_settings.get("open_manually", True) and self.process_detector.running:
+            self.rpc_wanted = True
+            self.loop.create_task(self._connect_rpc())
+
+    async def _load_online_scores(self):
+        username = self.settings.get("webapp_username")
+        self.online_scores = await self._io(self.online_api.fetch_user_scenario_scores, username)
+
+    async def _refresh_friends(self):
+        friends = self.settings.get("friends", [])
+        if friends:
+            await self._io(self.online_api.refresh_friends_in_background, friends)
+
+    async def _connect_rpc(self):
+        if self.rpc_running or self.connecting:
+            return
+        self.connecting = True
+        rpc = RpcClient(self.presence_factory)
+        try:
+            await asyncio.wrap_future(rpc.connect())
+        except Exception as e:
+            logger.error("Error starting RPC: %s", e)
+            rpc.close()
+            self.loop.call_later(self.PROCESS_INTERVAL, self._retry_connect)
+            return
+        finally:
+            self.connecting = False
+
+        if not (self.rpc_wanted and self.process_detector.running):
+            logger.info("RPC no longer wanted, closing the new connection")
+            rpc.close()
+            return
+
+        self.rpc = rpc
+        self.presence_manager = PresenceManager(rpc, schedule=self.loop.call_later)
+        self.start_time = time.time()
+        self.warm_scores.clear()
+        self.current_scenario = None
+        self.scenario_played = False
+        self._set_state(EngineState.RPC_CONNECTED)
+
+        if self.settings.get("show_online_scores") and self.settings.get("webapp_username"):
+            logger.info("Loading online scores...")
+            await self._load_online_scores()
+        await self._refresh_friends()
+
+        if self.run_history:
+            await self._io(self._start_stats_watcher)
+
+        logger.info("Discord RPC started")
+        self.scenario_task = self.loop.create_task(self._scenario_loop())
+        if self.run_history:
+            self._start_ingest()
+
+    def _retry_connect(self):
+        if self.rpc_wanted and self.process_detector.running:
+            self.loop.create_task(self._connect_rpc())
+
+    async def _disconnect_rpc(self, next_state):
+        if self.scenario_task:
+            self.scenario_task.cancel()
+            self.scenario_task = None
+        was_running = self.rpc_running
+        if self.stats_watcher:
+            await self._io(self._stop_stats_watcher)
+        if self.presence_manager:
+            self.presence_manager.clear()
+            self.presence_manager = None
+        if self.rpc:
+            try:
+                await asyncio.wrap_future(self.rpc.close())
+            except Exception as e:
+                logger.error("Error stopping RPC: %s", e)
+            self.rpc = None
+        self.current_scenario = None
+        self._set_state(next_state)
+        if was_running:
+            logger.info("Discord RPC stopped")
+
+    def _start_ingest(self):
+        if self.ingest_task is None or self.ingest_task.done():
+            self.ingest_task = self.loop.create_task(self._ingest_history())
+
+    async def _ingest_history(self):
+        try:
+            new_runs = await self.loop.run_in_executor(self.ingest_executor, self._sync_history)
+            await self._io(self._record_new_runs, new_runs)
+            if new_runs and self.state == EngineState.IN_SCENARIO:
+                self.local_highscore, self.session_highscore = await self._io(self._scenario_scores,
+                                                                              self.current_scenario)
+                await self._update_presence_scores()
+        except Exception as e:
+            logger.error("Error ingesting stats history: %s", e)
+
+    def _sync_history(self):
+        with metrics.timer("stats_scan"):
+            history = RunHistory(self.stats_directory, self.run_history.database)
+            try:
+                return history.sync(self._on_ingest_progress, self.ingest_cancel)
+            finally:
+                history.close()
+                self.ingest_progress = None
+
+    def _record_new_runs(self, new_runs):
+        if new_runs:
+            self.warm_scores.clear()
+        self.checked_runs.add_many(new_runs)
+
+    def _on_ingest_progress(self, progress):
+        self.ingest_progress = progress
+        logger.debug("Ingested %s/%s stats files, %.0fs left", progress.done, progress.total, progress.eta)
+
+    def _scenario_scores(self, scenario_name):
+        return (self.run_history.best(scenario_name),
+                self.run_history.session_best(scenario_name, self.start_time))
+
+    def _start_stats_watcher(self):
+        self.stats_watcher = create_stats_watcher(self.stats_directory, self._on_stats_file)
+        self.stats_watcher.start()
+
+    def _stop_stats_watcher(self):
+        self.stats_watcher.stop()
+        self.stats_watcher = None
+
+    async def _scenario_loop(self):
+        while self.rpc_running:
+            try:
+                with metrics.timer("scenario_tick"):
+                    await self._refresh_scenario()
+            except Exception as e:
+                logger.error("Error in RPC update loop: %s", e)
+            await asyncio.sleep(self.SCENARIO_INTERVAL)
+
+    async def _refresh_scenario(self):
+        raw_name = await self._io(metrics.timed, "session_read", self.session_reader.read)
+        allowed = await self._is_scenario_allowed(raw_name)
+        display_name = raw_name if allowed else "Unknown Scenario"
+
+        changed = display_name != self.current_scenario
+        if changed:
+            self.current_scenario = display_name
+            self.scenario_played = False
+            if allowed and self.run_history:
+                if self.stats_watcher is None:
+                    self._start_ingest()
+                self.local_highscore, self.session_highscore = await self._io(self._warm_scenario_scores, raw_name)
+                self.scenario_played = self.session_highscore > 0
+            else:
+                self.local_highscore = 0
+                self.session_highscore = 0
+            self._set_state(EngineState.IN_SCENARIO if allowed else EngineState.RPC_CONNECTED)
+            if allowed:
+                await self._refresh_friends()
+                await self._io(self._prefetch_ranks, raw_name)
+                self.loop.run_in_executor(self.io_executor, self._warm_playlist, raw_name)
+
+        if changed or time.monotonic() - self.last_presence_refresh >= self.REFRESH_INTERVAL:
+            await self._update_presence_scores()
+
+    def _upcoming_scenarios(self, scenario_name):
+        playlist = load_playlist(self.installation_path)
+        return playlist.upcoming(scenario_name) if playlist else []
+
+    def _prefetch_ranks(self, scenario_name):
+        username = self.settings.get("webapp_username")
+        if not (self.settings.get("show_online_scores") and username):
+            return
+        self.online_api.prefetch_ranks(username, [scenario_name] + self._upcoming_scenarios(scenario_name))
+
+    def _warm_scenario_scores(self, scenario_name):
+        scores = self.warm_scores.pop(scenario_name, None)
+        return scores if scores is not None else self._scenario_scores(scenario_name)
+
+    def _warm_playlist(self, scenario_name):
+        try:
+            upcoming = self._upcoming_scenarios(scenario_name)[:self.PLAYLIST_PREFETCH]
+            username = self.settings.get("webapp_username")
+            for name in upcoming:
+                if self.settings.get("online_only_scenarios") and name not in self.online_scenario_cache:
+                    self.online_scenario_cache[name] = self.online_api.is_scenario_available_online(username, name)
+                if self.run_history and name not in self.warm_scores:
+                    self.warm_scores[name] = self._scenario_scores(name)
+                if self.analytics:
+                    self.analytics.stats(name)
+                if self.settings.get("show_online_scores") and username:
+                    self.online_api.get_online_score(username, name)
+            if upcoming:
+                logger.debug("Warmed caches for upcoming scenarios: %s", ", ".join(upcoming))
+        except Exception as e:
+            logger.error("Error warming playlist scenarios: %s", e)
+
+    async def _is_scenario_allowed(self, scenario_name):
+        if not self.settings.get("online_only_scenarios", False):
+            return True
+
+        if not scenario_name or scenario_name == "Unknown Scenario":
+            return False
+
+        if scenario_name in self.online_scenario_cache:
+            return self.online_scenario_cache[scenario_name]
+
+        try:
+            logger.debug("Checking online availability for scenario: %s", scenario_name)
+            is_available = await self._io(
+                metrics.timed,
+                "online_check",
+                self.online_api.is_scenario_available_online,
+                self.settings.get("webapp_username"),
+                scenario_name
+            )
+
+            self.online_scenario_cache[scenario_name] = is_available
+
+            if is_available:
+                logger.debug("Scenario '%s' is available online", scenario_name)
+            else:
+                logger.info("Scenario '%s' is NOT available online - will be filtered out", scenario_name)
+
+            return is_available
+        except Exception as e:
+            logger.error("Error checking scenario availability for '%s': %s", scenario_name, e)
+            return True
+
+    def _on_stats_file(self, file_path):
+        future = asyncio.run_coroutine_threadsafe(self._handle_stats_file(file_path), self.loop)
+        return future.result(timeout=10)
+
+    async def _handle_stats_file(self, file_path):
+        result = await self._io(self._check_stats_file, file_path)
+        if result is None:
+            return await self._io(self.run_history.has_run, os.path.basename(file_path))
+        if result is True:
+            return True
+
+        scenario_name, score = result
+        if scenario_name == self.current_scenario:
+            await self._record_session_score(scenario_name)
+            self.urgent_update = True
+            await self._update_presence_scores()
+        return True
+
+    def _check_stats_file(self, file_path):
+        with metrics.timer("stats_file"):
+            return self._ingest_stats_file(file_path)
+
+    def _ingest_stats_file(self, file_path):
+        file_name = os.path.basename(file_path)
+        try:
+            mtime = os.stat(file_path).st_mtime_ns
+        except OSError:
+            return True
+        if self.checked_runs.is_checked(file_name, mtime) and self.run_history.has_run(file_name):
+            return True
+
+        result = self.run_history.add_file(file_path)
+        if result is not None:
+            self.warm_scores.pop(result[0], None)
+            self.checked_runs.add(file_name, mtime)
+        return result
+
+    async def _record_session_score(self, scenario_name):
+        self.scenario_played = True
+        self.local_highscore, self.session_highscore = await self._io(self._scenario_scores, scenario_name)
+
+        if self.settings.get("show_online_scores") and self.settings.get("webapp_username"):
+            username = self.settings.get("webapp_username")
+            if self.online_api.update_local_score(scenario_name, self.session_highscore, username):
+                self.online_scores[scenario_name] = self.session_highscore
+                logger.info("New all-time high detected for '%s': %s", scenario_name, self.session_highscore)
+
+    async def _update_presence_scores(self):
+        self.last_presence_refresh = time.monotonic()
+        display_name = self.current_scenario
+        try:
+            display_highscore = self.local_highscore
+            online_score = None
+            rank = None
+
+            if self.settings.get("show_online_scores") and self.settings.get("webapp_username"):
+                username = self.settings.get("webapp_username")
+                rank = self.online_api.get_rank(username, display_name)
+                online_score = await self._io(metrics.timed, "online_lookup", self.online_api.get_online_score,
+                                              username, display_name)
+                if online_score is not None:
+                    display_highscore = online_score
+                    logger.debug("Using online highscore for '%s': %s", display_name, online_score)
+                else:
+                    logger.debug("No online score found for '%s', using local: %s", display_name, self.local_highscore)
+
+            friend_score = None
+            friends = self.settings.get("friends", [])
+            if friends:
+                friend_score = await self._io(self.online_api.best_friend_score, friends, display_name)
+
+            run_stats = None
+            if self.analytics and self.state == EngineState.IN_SCENARIO:
+                run_stats = await self._io(self.analytics.stats, display_name, self.session_highscore or None)
+
+            urgent, self.urgent_update = self.urgent_update, False
+            update_presence(
+                self.presence_manager,
+                display_name,
+                self.start_time,
+                display_highscore,
+                self.session_highscore,
+                online_score,
+                self.installation_path,
+                urgent,
+                friend_score,
+                rank,
+                run_stats
+            )
+
+        except Exception as e:
+            logger.error("Error updating presence: %s", e)
+
+
+def run_headless(installation_path=None, port=CONTROL_PORT, start_rpc=False, **engine_options):
+    from modules.config import load_settings, save_settings, get_steam_path_from_registry
+
+    settings = load_settings()
+    installation_path = installation_path or settings.get("installation_path") or get_steam_path_from_registry()
+    if not installation_path:
+        logger.warning("No installation path configured, local scores are disabled")
+
+    engine = Engine(settings, installation_path, **engine_options)
+    stop_event = threading.Event()
+    signal.signal(signal.SIGINT, lambda *args: stop_event.set())
+    signal.signal(signal.SIGTERM, lambda *args: stop_event.set())
+
+    engine.start()
+    control = None
+    if port is not None:
+        control = ControlServer(engine, port=port, on_quit=stop_event.set, save_settings=save_settings)
+        control.start()
+    if start_rpc:
+        engine.start_rpc()
+
+    logger.info("Engine running headless")
+    try:
+        while not stop_event.wait(1):
+            pass
+    finally:
+        if control:
+            control.stop()
+        engine.stop()
+        engine.online_api.flush_local_scores()
+        logger.info("Engine stopped")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m modules.engine",
+                                     description="Run the Kovaak Discord RPC engine without the tray or window")
+    parser.add_argument("--headless", action="store_true", help="run the engine in the foreground")
+    parser.add_argument("--installation-path", default=None, help="FPSAimTrainer folder containing 'stats'")
+    parser.add_argument("--port", type=int, default=CONTROL_PORT, help="local control port (0 picks a free port)")
+    parser.add_argument("--no-control", action="store_true", help="do not listen for control commands")
+    parser.add_argument("--start-rpc", action="store_true", help="connect to Discord as soon as the game runs")
+    parser.add_argument("--log-level", default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR"])
+    parser.add_argument("--send", metavar="COMMAND", help="send a command to a running engine and print the reply")
+    args = parser.parse_args(argv)
+
+    if args.send:
+        try:
+            print(json.dumps(send_command(args.send, port=args.port), indent=2))
+        except OSError as e:
+            print(f"Could not reach engine on port {args.port}: {e}", file=sys.stderr)
+            return 1
+        return 0
+
+    if not args.headless:
+        parser.error("use --headless to run the engine, or main.py for the tray app")
+
+    setup_logging(args.log_level)
+    try:
+        return run_headless(args.installation_path, None if args.no_control else args.port, args.start_rpc)
+    finally:
+        shutdown_logging()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
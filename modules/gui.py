@@ -1,9 +1,17 @@
+import os
+import logging
 import customtkinter as ctk
 from tkinter import filedialog
 
 from modules.config import save_settings
+from modules.metrics import metrics
+from modules.log import ring_buffer, set_level
 from modules.startup_utils import set_startup_shortcut
 
+DIAGNOSTICS_REFRESH_MS = 1000
+INGEST_REFRESH_MS = 250
+LOG_LEVELS = ["DEBUG", "INFO", "WARNING", "ERROR"]
+
 
 class MainWindow(ctk.CTk):
     def __init__(self, settings, tray_app):
@@ -24,9 +32,13 @@ class MainWindow(ctk.CTk):
 
         self.tabview.add("Main")
         self.tabview.add("Settings")
+        self.tabview.add("Diagnostics")
+        self.tabview.add("Logs")
 
         self.create_main_tab()
         self.create_settings_tab()
+        self.create_diagnostics_tab()
+        self.create_logs_tab()
 
     def create_main_tab(self):
         main_frame = self.tabview.tab("Main")
@@ -60,6 +72,33 @@ class MainWindow(ctk.CTk):
         ctk.CTkButton(button_frame, text="Minimize to Tray", command=self.minimize_to_tray).pack(side="right", padx=10,
                                                                                                  pady=10)
 
+        self.ingest_frame = ctk.CTkFrame(main_frame)
+        self.ingest_label = ctk.CTkLabel(self.ingest_frame, text="", font=("Arial", 14))
+        self.ingest_label.pack(pady=(10, 5))
+        self.ingest_bar = ctk.CTkProgressBar(self.ingest_frame)
+        self.ingest_bar.set(0)
+        self.ingest_bar.pack(fill="x", padx=20, pady=5)
+        ctk.CTkButton(self.ingest_frame, text="Cancel", command=self.tray_app.cancel_ingest).pack(pady=(5, 10))
+        self.ingest_visible = False
+
+        self.refresh_ingest_progress()
+
+    def refresh_ingest_progress(self):
+        progress = self.tray_app.ingest_progress
+        if progress is None:
+            if self.ingest_visible:
+                self.ingest_frame.pack_forget()
+                self.ingest_visible = False
+        else:
+            if not self.ingest_visible:
+                self.ingest_frame.pack(fill="x", pady=10, padx=20)
+                self.ingest_visible = True
+            minutes, seconds = divmod(int(progress.eta), 60)
+            self.ingest_bar.set(progress.done / progress.total)
+            self.ingest_label.configure(text=f"Indexing stats: {progress.done}/{progress.total} files "
+                                             f"({minutes}:{seconds:02d} left)")
+        self.after(INGEST_REFRESH_MS, self.refresh_ingest_progress)
+
     def create_settings_tab(self):
         settings_frame = self.tabview.tab("Settings")
 
@@ -108,10 +147,16 @@ class MainWindow(ctk.CTk):
 
         self.online_only_var = ctk.BooleanVar(value=self.settings.get("online_only_scenarios", False))
         self.cb_online_only = ctk.CTkCheckBox(
-            online_frame, text="Only show scenarios that are available online (exact match required)",
+            online_frame, text="Only show scenarios that are available online (close name matches allowed)",
             variable=self.online_only_var)
         self.cb_online_only.pack(pady=5, padx=20, anchor="w")
 
+        ctk.CTkLabel(online_frame, text="Friends to compare against (comma separated usernames):").pack(
+            anchor="w", padx=20, pady=(10, 0))
+        self.friends_entry = ctk.CTkEntry(online_frame, width=400)
+        self.friends_entry.insert(0, ", ".join(self.settings.get("friends", [])))
+        self.friends_entry.pack(pady=5, padx=20, anchor="w")
+
         self.update_online_checkbox_state()
 
         path_frame = ctk.CTkFrame(scrollable_frame)
@@ -144,6 +189,80 @@ class MainWindow(ctk.CTk):
                       font=("Arial", 16, "bold")).pack(pady=10)
         set_startup_shortcut(self.settings["start_with_windows"])
 
+    def create_diagnostics_tab(self):
+        diagnostics_frame = self.tabview.tab("Diagnostics")
+
+        ctk.CTkLabel(diagnostics_frame, text="Hot Path Timings", font=("Arial", 18, "bold")).pack(pady=10)
+
+        self.metrics_enabled_var = ctk.BooleanVar(value=metrics.enabled)
+        ctk.CTkCheckBox(diagnostics_frame, text="Collect timings", variable=self.metrics_enabled_var,
+                        command=self.toggle_metrics).pack(pady=5, padx=20, anchor="w")
+
+        self.metrics_text = ctk.CTkTextbox(diagnostics_frame, font=("Courier New", 13))
+        self.metrics_text.pack(fill="both", expand=True, padx=20, pady=10)
+
+        button_frame = ctk.CTkFrame(diagnostics_frame)
+        button_frame.pack(fill="x", pady=10, padx=20)
+
+        ctk.CTkButton(button_frame, text="Save Metrics", command=self.save_metrics).pack(side="left", padx=10, pady=10)
+        ctk.CTkButton(button_frame, text="Reset", command=metrics.reset).pack(side="left", padx=10, pady=10)
+        self.metrics_status_label = ctk.CTkLabel(button_frame, text="")
+        self.metrics_status_label.pack(side="right", padx=10)
+
+        self.refresh_diagnostics()
+
+    def refresh_diagnostics(self):
+        if self.tabview.get() == "Diagnostics" and self.winfo_viewable():
+            self.metrics_text.configure(state="normal")
+            self.metrics_text.delete("1.0", "end")
+            self.metrics_text.insert("1.0", metrics.format())
+            self.metrics_text.configure(state="disabled")
+        self.after(DIAGNOSTICS_REFRESH_MS, self.refresh_diagnostics)
+
+    def create_logs_tab(self):
+        logs_frame = self.tabview.tab("Logs")
+
+        controls_frame = ctk.CTkFrame(logs_frame)
+        controls_frame.pack(fill="x", pady=10, padx=20)
+
+        ctk.CTkLabel(controls_frame, text="Log level:").pack(side="left", padx=10)
+        current_level = logging.getLevelName(logging.getLogger("kovaaks").getEffectiveLevel())
+        self.log_level_var = ctk.StringVar(value=current_level if current_level in LOG_LEVELS else "INFO")
+        ctk.CTkOptionMenu(controls_frame, values=LOG_LEVELS, variable=self.log_level_var,
+                          command=self.change_log_level).pack(side="left", padx=10, pady=10)
+
+        self.log_text = ctk.CTkTextbox(logs_frame, font=("Courier New", 12))
+        self.log_text.pack(fill="both", expand=True, padx=20, pady=10)
+        self.log_version = None
+
+        self.refresh_logs()
+
+    def refresh_logs(self):
+        if (self.tabview.get() == "Logs" and self.winfo_viewable() and
+                ring_buffer.version != self.log_version):
+            self.log_version = ring_buffer.version
+            level = logging.getLevelName(self.log_level_var.get())
+            self.log_text.configure(state="normal")
+            self.log_text.delete("1.0", "end")
+            self.log_text.insert("1.0", "\n".join(ring_buffer.lines(level)))
+            self.log_text.see("end")
+            self.log_text.configure(state="disabled")
+        self.after(DIAGNOSTICS_REFRESH_MS, self.refresh_logs)
+
+    def change_log_level(self, level_name):
+        set_level(logging.getLevelName(level_name))
+        self.log_version = None
+
+    def toggle_metrics(self):
+        metrics.enabled = self.metrics_enabled_var.get()
+
+    def save_metrics(self):
+        path = metrics.dump()
+        if path:
+            self.metrics_status_label.configure(text=f"Saved to {os.path.abspath(path)}")
+        else:
+            self.metrics_status_label.configure(text="Could not save metrics")
+
     def on_username_change(self, event=None):
         self.update_online_checkbox_state()
 
@@ -173,6 +292,7 @@ class MainWindow(ctk.CTk):
         self.settings["webapp_username"] = self.webapp_entry.get().strip()
         self.settings["show_online_scores"] = self.show_online_var.get()
         self.settings["online_only_scenarios"] = self.online_only_var.get()
+        self.settings["friends"] = [name.strip() for name in self.friends_entry.get().split(",") if name.strip()]
         self.settings["installation_path"] = self.install_entry.get().strip()
         self.settings["steam_path"] = self.steam_entry.get().strip()
         self.settings["start_with_windows"] = self.start_with_windows_var.get()
@@ -190,11 +310,11 @@ class MainWindow(ctk.CTk):
 
     def start_rpc(self):
         self.tray_app.start_rpc()
-        self.update_status()
+        self.after(500, self.update_status)
 
     def stop_rpc(self):
         self.tray_app.stop_rpc()
-        self.update_status()
+        self.after(500, self.update_status)
 
     def update_status(self):
         rpc_status = "Running" if self.tray_app.rpc_running else "Stopped"
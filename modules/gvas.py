@@ -0,0 +1,221 @@
+import struct
+
+INT32 = struct.Struct("<i")
+UINT32 = struct.Struct("<I")
+INT64 = struct.Struct("<q")
+UINT64 = struct.Struct("<Q")
+FLOAT = struct.Struct("<f")
+DOUBLE = struct.Struct("<d")
+ENGINE_VERSION = struct.Struct("<HHHI")
+PROPERTY_SIZE = struct.Struct("<ii")
+
+SCALAR_TYPES = {
+    "IntProperty": INT32,
+    "UInt32Property": UINT32,
+    "Int64Property": INT64,
+    "UInt64Property": UINT64,
+    "FloatProperty": FLOAT,
+    "DoubleProperty": DOUBLE,
+}
+STRING_TYPES = ("StrProperty", "NameProperty", "EnumProperty")
+SCENARIO_KEYS = ("FullScenarioPath", "LastEditProfile")
+
+
+class GvasError(ValueError):
+    pass
+
+
+def _unpack(fmt, view, offset):
+    if offset < 0 or offset + fmt.size > len(view):
+        raise GvasError(f"Unexpected end of data at offset {offset}")
+    return fmt.unpack_from(view, offset)[0], offset + fmt.size
+
+
+def read_fstring(view, offset):
+    try:
+        length = INT32.unpack_from(view, offset)[0]
+    except struct.error:
+        raise GvasError(f"Unexpected end of data at offset {offset}")
+    offset += 4
+    if length >= 0:
+        end = offset + length
+        stop = end - 1 if length else end
+        encoding = "utf-8"
+    else:
+        end = offset - length * 2
+        stop = end - 2
+        encoding = "utf-16-le"
+    if end > len(view):
+        raise GvasError(f"String at offset {offset} runs past end of data")
+    return str(view[offset:stop], encoding, "replace"), end
+
+
+class GvasProperty:
+    __slots__ = ("name", "type", "view", "start", "size", "tag")
+
+    def __init__(self, name, type_name, view, start, size, tag):
+        self.name = name
+        self.type = type_name
+        self.view = view
+        self.start = start
+        self.size = size
+        self.tag = tag
+
+    @property
+    def raw(self):
+        return self.view[self.start:self.start + self.size]
+
+    @property
+    def value(self):
+        if self.type in STRING_TYPES:
+            return read_fstring(self.view, self.start)[0]
+        if self.type in SCALAR_TYPES:
+            return _unpack(SCALAR_TYPES[self.type], self.view, self.start)[0]
+        if self.type == "BoolProperty":
+            return self.tag
+        if self.type == "ByteProperty":
+            if self.tag == "None":
+                return self.view[self.start]
+            return read_fstring(self.view, self.start)[0]
+        if self.type == "StructProperty" and self.size > 0:
+            try:
+                return GvasProperties(self.view, self.start, self.start + self.size)
+            except GvasError:
+                return self.raw
+        if self.type == "ArrayProperty" and self.tag in STRING_TYPES:
+            count, offset = _unpack(INT32, self.view, self.start)
+            values = []
+            for _ in range(count):
+                value, offset = read_fstring(self.view, offset)
+                values.append(value)
+            return values
+        return self.raw
+
+    def __repr__(self):
+        return f"GvasProperty({self.name!r}, {self.type!r}, size={self.size})"
+
+
+class GvasProperties:
+    def __init__(self, view, offset, end=None):
+        self.view = view
+        self.end = len(view) if end is None else end
+        self.items = []
+        self.index = {}
+        self.offset = offset
+        self._parse()
+
+    def _parse(self):
+        view = self.view
+        offset = self.offset
+        while True:
+            if offset >= self.end:
+                raise GvasError("Property list is not terminated")
+            name, offset = read_fstring(view, offset)
+            if name == "None" or not name:
+                break
+            type_name, offset = read_fstring(view, offset)
+            if offset + PROPERTY_SIZE.size > self.end:
+                raise GvasError(f"Truncated property {name!r}")
+            size = PROPERTY_SIZE.unpack_from(view, offset)[0]
+            offset += PROPERTY_SIZE.size
+            if size < 0:
+                raise GvasError(f"Negative size for property {name!r}")
+
+            tag = None
+            if type_name == "BoolProperty":
+                if offset >= self.end:
+                    raise GvasError(f"Truncated bool property {name!r}")
+                tag = bool(view[offset])
+                offset += 1
+            elif type_name == "StructProperty":
+                tag, offset = read_fstring(view, offset)
+                offset += 16
+            elif type_name in ("ArrayProperty", "SetProperty", "ByteProperty", "EnumProperty"):
+                tag, offset = read_fstring(view, offset)
+            elif type_name == "MapProperty":
+                key_type, offset = read_fstring(view, offset)
+                value_type, offset = read_fstring(view, offset)
+                tag = (key_type, value_type)
+
+            if offset >= self.end:
+                raise GvasError(f"Truncated property {name!r}")
+            has_guid = view[offset]
+            offset += 17 if has_guid else 1
+
+            if offset + size > self.end:
+                raise GvasError(f"Property {name!r} runs past end of data")
+            prop = GvasProperty(name, type_name, view, offset, size, tag)
+            self.items.append(prop)
+            self.index.setdefault(name, prop)
+            offset += size
+        self.offset = offset
+
+    def __getitem__(self, name):
+        return self.index[name]
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def get(self, name, default=None):
+        prop = self.index.get(name)
+        return prop.value if prop is not None else default
+
+    def walk(self):
+        for prop in self.items:
+            yield prop
+            if prop.type == "StructProperty":
+                nested = prop.value
+                if isinstance(nested, GvasProperties):
+                    yield from nested.walk()
+
+
+class GvasFile:
+    def __init__(self, data):
+        self.view = memoryview(data)
+        if len(self.view) < 4 or self.view[:4] != b"GVAS":
+            raise GvasError("Missing GVAS header")
+        offset = 4
+        self.save_game_version, offset = _unpack(INT32, self.view, offset)
+        self.package_version, offset = _unpack(INT32, self.view, offset)
+        if self.save_game_version >= 3:
+            self.package_version_ue5, offset = _unpack(INT32, self.view, offset)
+        if offset + ENGINE_VERSION.size > len(self.view):
+            raise GvasError("Truncated engine version")
+        self.engine_version = ENGINE_VERSION.unpack_from(self.view, offset)
+        offset += ENGINE_VERSION.size
+        self.engine_branch, offset = read_fstring(self.view, offset)
+        self.custom_version_format, offset = _unpack(INT32, self.view, offset)
+        count, offset = _unpack(INT32, self.view, offset)
+        if count < 0 or offset + count * 20 > len(self.view):
+            raise GvasError("Invalid custom version count")
+        offset += count * 20
+        self.save_game_class, offset = read_fstring(self.view, offset)
+        self.properties = GvasProperties(self.view, offset)
+
+    def get(self, name, default=None):
+        return self.properties.get(name, default)
+
+
+def parse_gvas(data):
+    try:
+        return GvasFile(data)
+    except GvasError:
+        raise
+    except (struct.error, IndexError, ValueError, LookupError) as e:
+        raise GvasError(str(e)) from e
+
+
+def scenario_name_from_gvas(gvas):
+    last_string = None
+    for prop in gvas.properties.walk():
+        if prop.name in SCENARIO_KEYS:
+            return last_string
+        if prop.type in ("StrProperty", "NameProperty"):
+            last_string = prop.value
+    return None
@@ -0,0 +1,73 @@
+import os
+import time
+from collections import namedtuple
+
+from modules.kovaaks_utils import parse_stats_summary, scenario_from_filename
+from modules.log import get_logger
+
+logger = get_logger("ingest")
+
+PARALLEL_THRESHOLD = 5000
+CHUNK_SIZE = 500
+MAX_WORKERS = 8
+
+IngestProgress = namedtuple('IngestProgress', ['done', 'total', 'elapsed', 'eta'])
+
+
+def parse_run(file_name, file_path, size, mtime):
+    scenario = scenario_from_filename(file_name)
+    if scenario is None:
+        return None
+    try:
+        summary = parse_stats_summary(file_path)
+    except Exception as e:
+        logger.error("Error reading file %s: %s", file_name, e)
+        return None
+    if summary is None:
+        return None
+    return (file_name, scenario, summary.timestamp, summary.score, summary.accuracy, summary.kills,
+            summary.fight_time, summary.sensitivity, summary.sens_scale, size, mtime)
+
+
+def parse_chunk(entries):
+    rows = []
+    failed = 0
+    for entry in entries:
+        row = parse_run(*entry)
+        if row is not None:
+            rows.append(row)
+        elif scenario_from_filename(entry[0]) is not None:
+            failed += 1
+    return rows, failed
+
+
+def default_workers():
+    return max(1, min(MAX_WORKERS, (os.cpu_count() or 1) - 1))
+
+
+def ingest_runs(entries, workers=None, chunk_size=CHUNK_SIZE, progress=None, cancel=None):
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    if cancel is not None and cancel.is_set():
+        return
+    total = len(entries)
+    workers = workers or default_workers()
+    chunks = [entries[i:i + chunk_size] for i in range(0, total, chunk_size)]
+    logger.info("Ingesting %s stats files with %s workers", total, workers)
+
+    start = time.monotonic()
+    done = 0
+    executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        futures = {executor.submit(parse_chunk, chunk): len(chunk) for chunk in chunks}
+        for future in as_completed(futures):
+            if cancel is not None and cancel.is_set():
+                logger.info("Stats ingestion cancelled after %s of %s files", done, total)
+                return
+            yield future.result()
+            done += futures[future]
+            if progress:
+                elapsed = time.monotonic() - start
+                progress(IngestProgress(done, total, elapsed, elapsed / done * (total - done)))
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
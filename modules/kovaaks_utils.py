@@ -1,72 +1,221 @@
 import os
-import shutil
 import psutil
+from collections import namedtuple
+from datetime import datetime
 
+from modules.gvas import GvasError, parse_gvas, scenario_name_from_gvas
+from modules.metrics import metrics
+from modules.log import get_logger
 
-def is_kovaaks_running():
+logger = get_logger("kovaaks_utils")
+
+PROCESS_NAME = 'FPSAimTrainer.exe'
+
+
+def find_kovaaks_process():
     for process in psutil.process_iter(['name']):
         try:
-            if 'FPSAimTrainer.exe' in process.info['name']:
-                return True
+            name = process.info['name']
+            if name and PROCESS_NAME in name:
+                return process
         except (psutil.NoSuchProcess, psutil.AccessDenied):
             continue
-    return False
+    return None
+
+
+def is_kovaaks_running():
+    return find_kovaaks_process() is not None
 
 
 def extract_scenario_name(file_path):
     try:
         with open(file_path, 'rb') as file:
             data = file.read()
+        return scenario_name_from_bytes(data)
+    except Exception as e:
+        logger.error("Error reading file: %s", e)
+        return "Unknown Scenario"
 
 
-        keys = [b'FullScenarioPath', b'LastEditProfile']
-        key_pos = -1
-        used_key = None
+def scenario_name_from_bytes(data):
+    try:
+        scenario_name = scenario_name_from_gvas(parse_gvas(data))
+    except GvasError as e:
+        logger.debug("Error parsing session file, falling back to scan: %s", e)
+        scenario_name = None
+    return scenario_name or _scan_scenario_name(data)
 
 
-        for key in keys:
-            key_pos = data.find(key)
-            if key_pos != -1:
-                used_key = key
-                break
+def _scan_scenario_name(data):
+    keys = [b'FullScenarioPath', b'LastEditProfile']
+    key_pos = -1
 
-        if key_pos == -1:
-            return "Unknown Scenario"
+    for key in keys:
+        key_pos = data.find(key)
+        if key_pos != -1:
+            break
 
-        end = key_pos
-        while end > 0 and (data[end - 1] < 32 or data[end - 1] > 126):
-            end -= 1
+    if key_pos == -1:
+        return "Unknown Scenario"
 
-        start = end - 1
-        while start > 0 and 32 <= data[start] <= 126:
-            start -= 1
-        start += 1
+    end = key_pos
+    while end > 0 and (data[end - 1] < 32 or data[end - 1] > 126):
+        end -= 1
 
-        scenario_name = data[start:end].decode('utf-8', errors='replace')
-        return scenario_name
+    start = end - 1
+    while start > 0 and 32 <= data[start] <= 126:
+        start -= 1
+    start += 1
 
-    except Exception as e:
-        print(f"Error reading file: {e}")
-        return "Unknown Scenario"
+    return data[start:end].decode('utf-8', errors='replace')
+
+
+def get_session_path():
+    return os.path.join(os.getenv('LOCALAPPDATA', ''), "FPSAimTrainer", "Saved", "SaveGames", "session.sav")
+
+
+class SessionReader:
+    def __init__(self, path=None):
+        self.path = path or get_session_path()
+        self.signature = None
+        self.scenario_name = "Unknown Scenario"
+
+    def read(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            self.signature = None
+            self.scenario_name = "Unknown Scenario"
+            return self.scenario_name
 
+        signature = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        if signature == self.signature:
+            return self.scenario_name
+
+        try:
+            with open(self.path, 'rb') as file:
+                data = file.read()
+        except OSError as e:
+            logger.error("Error reading session file: %s", e)
+            return self.scenario_name
+
+        metrics.increment("session_bytes_read", len(data))
+        self.scenario_name = scenario_name_from_bytes(data)
+        self.signature = signature
+        return self.scenario_name
 
 
+_session_reader = None
+
 
 def get_current_scenario():
+    global _session_reader
     try:
-        temp_file_path = os.path.join(os.getenv('LOCALAPPDATA'), "Temp", "session_copy.sav")
-        source_path = os.path.join(os.getenv('LOCALAPPDATA'), "FPSAimTrainer", "Saved", "SaveGames", "session.sav")
-
-        if os.path.exists(source_path):
-            shutil.copy(source_path, temp_file_path)
-            scenario_name = extract_scenario_name(temp_file_path)
-            return scenario_name
+        if _session_reader is None:
+            _session_reader = SessionReader()
+        return _session_reader.read()
     except Exception as e:
-        print(f"Error getting current scenario: {e}")
+        logger.error("Error getting current scenario: %s", e)
 
     return "Unknown Scenario"
 
 
+StatsSummary = namedtuple('StatsSummary', [
+    'scenario', 'score', 'accuracy', 'kills', 'fight_time', 'sensitivity', 'sens_scale', 'timestamp'
+])
+
+SUMMARY_READ_SIZE = 4096
+SUMMARY_START = b"Weapon,Shots,Hits"
+
+
+def _read_summary_block(file):
+    file.seek(0, os.SEEK_END)
+    size = file.tell()
+    read_size = SUMMARY_READ_SIZE
+    while True:
+        offset = max(0, size - read_size)
+        file.seek(offset)
+        tail = file.read(size - offset)
+        metrics.increment("stats_bytes_read", len(tail))
+        start = tail.rfind(SUMMARY_START)
+        if start != -1:
+            return tail[start:]
+        if offset == 0:
+            return tail
+        read_size *= 4
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def scenario_from_filename(file_name):
+    if not file_name.endswith(".csv"):
+        return None
+    parts = file_name.rsplit(" - ", 2)
+    if len(parts) != 3:
+        return None
+    return parts[0]
+
+
+def parse_stats_timestamp(file_name):
+    try:
+        stamp = file_name.rsplit(" - ", 1)[1]
+        return datetime(int(stamp[0:4]), int(stamp[5:7]), int(stamp[8:10]),
+                        int(stamp[11:13]), int(stamp[14:16]), int(stamp[17:19])).timestamp()
+    except (IndexError, ValueError):
+        return None
+
+
+def parse_stats_summary(file_path):
+    with open(file_path, 'rb') as file:
+        block = _read_summary_block(file)
+
+    fields = {}
+    shots = hits = 0
+    in_weapons = False
+    for line in block.decode('utf-8', errors='replace').splitlines():
+        if not line:
+            in_weapons = False
+            continue
+        columns = line.split(',')
+        if line.startswith("Weapon,Shots,Hits"):
+            in_weapons = True
+        elif in_weapons and len(columns) > 2:
+            shots += int(_to_float(columns[1]) or 0)
+            hits += int(_to_float(columns[2]) or 0)
+        elif columns[0].endswith(':') and len(columns) > 1:
+            fields[columns[0][:-1]] = columns[1]
+
+    score = _to_float(fields.get('Score'))
+    if score is None:
+        return None
+
+    kills = _to_float(fields.get('Kills'))
+    timestamp = parse_stats_timestamp(os.path.basename(file_path))
+    if timestamp is None:
+        timestamp = os.path.getmtime(file_path)
+
+    return StatsSummary(
+        scenario=fields.get('Scenario'),
+        score=score,
+        accuracy=hits / shots if shots else None,
+        kills=int(kills) if kills is not None else None,
+        fight_time=_to_float(fields.get('Fight Time')),
+        sensitivity=_to_float(fields.get('Horiz Sens')),
+        sens_scale=fields.get('Sens Scale'),
+        timestamp=timestamp
+    )
+
+
+def read_stats_score(file_path):
+    summary = parse_stats_summary(file_path)
+    return summary.score if summary else None
+
+
 def find_initial_scores(scenario_name, stats_directory):
     highscore = 0
     temp_checked_files = set()
@@ -74,14 +223,12 @@ def find_initial_scores(scenario_name, stats_directory):
         if file_name.startswith(f"{scenario_name} - ") and file_name.endswith(".csv"):
             file_path = os.path.join(stats_directory, file_name)
             try:
-                with open(file_path, 'r') as file:
-                    for line in file:
-                        if "Score:," in line:
-                            score = float(line.split(',')[1])
-                            highscore = max(highscore, score)
+                score = read_stats_score(file_path)
+                if score is not None:
+                    highscore = max(highscore, score)
                 temp_checked_files.add(file_name)
             except Exception as e:
-                print(f"Error reading file {file_name}: {e}")
+                logger.error("Error reading file %s: %s", file_name, e)
     return round(highscore, 1), temp_checked_files
 
 
@@ -90,16 +237,13 @@ def find_fight_time_and_score(scenario_name, stats_directory, checked_files):
     found_new_score = False
     try:
         for file_name in os.listdir(stats_directory):
-            if file_name == file_name.startswith(f"{scenario_name} - ") and file_name not in checked_files:
-                file_path = os.path.join(stats_directory, file_name)
-                with open(file_path, 'r') as file:
-                    for row in file:
-                        if "Score:," in row:
-                            score = float(row.split(',')[1])
-                            max_score = max(max_score, score)
-                            found_new_score = True
-                            checked_files.add(file_name)
+            if file_name.startswith(f"{scenario_name} - ") and file_name not in checked_files:
+                score = read_stats_score(os.path.join(stats_directory, file_name))
+                if score is not None:
+                    max_score = max(max_score, score)
+                    found_new_score = True
+                    checked_files.add(file_name)
     except Exception as e:
-        print(f"Error finding fight time and score: {e}")
+        logger.error("Error finding fight time and score: %s", e)
 
     return round(max_score, 1), found_new_score
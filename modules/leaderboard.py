@@ -0,0 +1,175 @@
+import os
+import json
+import time
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from modules.log import get_logger
+
+logger = get_logger("leaderboard")
+
+LEADERBOARD_FILE = "leaderboards.json"
+RANK_TTL = 5 * 60
+SIZE_TTL = 60 * 60
+OFFLINE_BACKOFF = 60
+BATCH_WORKERS = 4
+MOST_PLAYED_PREFETCH = 10
+
+RankInfo = namedtuple('RankInfo', ['rank', 'total', 'top_percent', 'score'])
+
+
+def make_rank(rank, total, score=None):
+    if not rank or not total:
+        return None
+    return RankInfo(rank, total, rank / total * 100, score)
+
+
+class LeaderboardRanks:
+    def __init__(self, api, cache_dir):
+        self.api = api
+        self.path = os.path.join(cache_dir, LEADERBOARD_FILE)
+        self.leaderboard_ids = {}
+        self.plays = {}
+        self.entry_ranks = {}
+        self.sizes = {}
+        self.ranks = {}
+        self.pending = set()
+        self.offline_until = 0
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=BATCH_WORKERS)
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.leaderboard_ids = data.get('leaderboard_ids', {})
+            self.plays = data.get('plays', {})
+            self.entry_ranks = {scenario: tuple(rank) for scenario, rank in data.get('entry_ranks', {}).items()}
+        except Exception as e:
+            logger.error("Error loading leaderboard ids: %s", e)
+
+    def _save(self):
+        with self.lock:
+            data = {
+                'leaderboard_ids': dict(self.leaderboard_ids),
+                'plays': dict(self.plays),
+                'entry_ranks': dict(self.entry_ranks)
+            }
+        temp_path = self.path + ".tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(temp_path, self.path)
+        except Exception as e:
+            logger.error("Error saving leaderboard ids: %s", e)
+
+    def update_from_entries(self, entries):
+        with self.lock:
+            for entry in entries:
+                scenario = entry.get('scenarioName', '').strip()
+                leaderboard_id = entry.get('leaderboardId')
+                if not scenario or leaderboard_id is None:
+                    continue
+                self.leaderboard_ids[scenario] = leaderboard_id
+                plays = entry.get('counts', {}).get('plays')
+                if plays is not None:
+                    self.plays[scenario] = plays
+                if entry.get('rank'):
+                    self.entry_ranks[scenario] = (entry['rank'], entry.get('score'))
+        self._save()
+
+    def most_played(self, count=MOST_PLAYED_PREFETCH):
+        with self.lock:
+            return sorted(self.plays, key=self.plays.get, reverse=True)[:count]
+
+    def lookup(self, username, scenario_name):
+        if not username or not scenario_name:
+            return None
+        with self.lock:
+            cached = self.ranks.get((username, scenario_name))
+            fallback = self._entry_rank(scenario_name)
+        if cached is None or time.time() - cached[1] >= RANK_TTL:
+            self.prefetch(username, [scenario_name])
+        return cached[0] if cached else fallback
+
+    def _entry_rank(self, scenario_name):
+        entry_rank = self.entry_ranks.get(scenario_name)
+        size = self.sizes.get(self.leaderboard_ids.get(scenario_name))
+        if entry_rank is None or size is None:
+            return None
+        return make_rank(entry_rank[0], size[0], entry_rank[1])
+
+    def prefetch(self, username, scenario_names):
+        now = time.time()
+        if not username or now < self.offline_until:
+            return
+        batch = []
+        with self.lock:
+            for scenario in scenario_names:
+                key = (username, scenario)
+                cached = self.ranks.get(key)
+                if key in self.pending or scenario not in self.leaderboard_ids:
+                    continue
+                if cached is not None and now - cached[1] < RANK_TTL:
+                    continue
+                self.pending.add(key)
+                batch.append((scenario, self.leaderboard_ids[scenario]))
+        for scenario, leaderboard_id in batch:
+            self.executor.submit(self._fetch, username, scenario, leaderboard_id)
+
+    def _fetch(self, username, scenario_name, leaderboard_id):
+        try:
+            if time.time() < self.offline_until:
+                return
+            total = self._leaderboard_size(leaderboard_id)
+            rank = self.fetch_rank(username, leaderboard_id, total) if total else None
+            if rank is not None:
+                with self.lock:
+                    self.ranks[(username, scenario_name)] = (rank, time.time())
+        except Exception as e:
+            logger.error("Error fetching rank for '%s': %s", scenario_name, e)
+        finally:
+            with self.lock:
+                self.pending.discard((username, scenario_name))
+
+    def _leaderboard_size(self, leaderboard_id):
+        with self.lock:
+            cached = self.sizes.get(leaderboard_id)
+        if cached is not None and time.time() - cached[1] < SIZE_TTL:
+            return cached[0]
+        data = self._get({"leaderboardId": leaderboard_id, "page": 0, "max": 1})
+        total = data.get('total') if data else None
+        if isinstance(total, int):
+            with self.lock:
+                self.sizes[leaderboard_id] = (total, time.time())
+            return total
+        return cached[0] if cached else None
+
+    def fetch_rank(self, username, leaderboard_id, total):
+        data = self._get({"leaderboardId": leaderboard_id, "page": 0, "max": 10, "usernameSearch": username})
+        if not data:
+            return None
+        wanted = username.lower()
+        for entry in data.get('data', []):
+            names = (entry.get('webappUsername'), entry.get('steamAccountName'))
+            if any(name and name.lower() == wanted for name in names):
+                return make_rank(entry.get('rank'), total, entry.get('score'))
+        return None
+
+    def _get(self, params):
+        import requests
+
+        try:
+            resp = self.api._get_session().get(f"{self.api.base_url}/leaderboard/scores/global",
+                                               params=params, timeout=10)
+            if resp.status_code != 200:
+                return None
+            return resp.json()
+        except (requests.RequestException, ValueError) as e:
+            logger.warning("Leaderboard unavailable, retrying in %ss: %s", OFFLINE_BACKOFF, e)
+            self.offline_until = time.time() + OFFLINE_BACKOFF
+            return None
@@ -0,0 +1,83 @@
+import sys
+import queue
+import logging
+import threading
+from collections import deque
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+LOGGER_NAME = "kovaaks"
+LOG_FILE = "kovaaks_rpc.log"
+LOG_MAX_BYTES = 1024 * 1024
+LOG_BACKUPS = 3
+RING_BUFFER_SIZE = 500
+LOG_FORMAT = "%(asctime)s %(levelname)-8s %(name)s: %(message)s"
+
+
+class DeferredQueueHandler(QueueHandler):
+    def prepare(self, record):
+        return record
+
+
+class RingBufferHandler(logging.Handler):
+    def __init__(self, capacity=RING_BUFFER_SIZE):
+        super().__init__()
+        self.records = deque(maxlen=capacity)
+        self.version = 0
+        self.setFormatter(logging.Formatter(LOG_FORMAT, "%H:%M:%S"))
+
+    def emit(self, record):
+        self.records.append(record)
+        self.version += 1
+
+    def lines(self, level=logging.NOTSET):
+        return [self.format(record) for record in list(self.records) if record.levelno >= level]
+
+
+ring_buffer = RingBufferHandler()
+_listener = None
+_lock = threading.Lock()
+
+
+def get_logger(name):
+    return logging.getLogger(f"{LOGGER_NAME}.{name}")
+
+
+def setup_logging(level=logging.INFO, log_file=LOG_FILE, console=True):
+    global _listener
+    with _lock:
+        if _listener:
+            return
+        formatter = logging.Formatter(LOG_FORMAT)
+        handlers = [ring_buffer]
+        if log_file:
+            try:
+                file_handler = RotatingFileHandler(log_file, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS,
+                                                   encoding='utf-8', delay=True)
+                file_handler.setFormatter(formatter)
+                handlers.append(file_handler)
+            except OSError as e:
+                sys.stderr.write(f"Error opening log file: {e}\n")
+        if console and sys.stderr:
+            console_handler = logging.StreamHandler(sys.stderr)
+            console_handler.setFormatter(formatter)
+            handlers.append(console_handler)
+
+        log_queue = queue.SimpleQueue()
+        root = logging.getLogger(LOGGER_NAME)
+        root.handlers = [DeferredQueueHandler(log_queue)]
+        root.setLevel(level)
+        root.propagate = False
+        _listener = QueueListener(log_queue, *handlers)
+        _listener.start()
+
+
+def set_level(level):
+    logging.getLogger(LOGGER_NAME).setLevel(level)
+
+
+def shutdown_logging():
+    global _listener
+    with _lock:
+        if _listener:
+            _listener.stop()
+            _listener = None
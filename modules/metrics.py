@@ -0,0 +1,152 @@
+import os
+import json
+import time
+import threading
+from collections import deque
+
+from modules.log import get_logger
+
+logger = get_logger("metrics")
+
+METRICS_FILE = "metrics.jsonl"
+METRICS_MAX_BYTES = 1024 * 1024
+METRICS_BACKUPS = 3
+HISTOGRAM_WINDOW = 512
+
+
+class LatencyHistogram:
+    def __init__(self, window=HISTOGRAM_WINDOW):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+
+    def record(self, seconds):
+        self.samples.append(seconds)
+        self.count += 1
+        self.total += seconds
+
+    def snapshot(self):
+        samples = sorted(self.samples)
+        if not samples:
+            return {"count": self.count, "p50": 0.0, "p95": 0.0, "max": 0.0, "mean": 0.0}
+        return {
+            "count": self.count,
+            "p50": samples[len(samples) // 2],
+            "p95": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+            "max": samples[-1],
+            "mean": self.total / self.count,
+        }
+
+
+class _Timer:
+    __slots__ = ("metrics", "name", "start")
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.metrics.record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class Metrics:
+    def __init__(self, enabled=True, window=HISTOGRAM_WINDOW):
+        self.enabled = enabled
+        self.window = window
+        self.timers = {}
+        self.counters = {}
+        self.lock = threading.Lock()
+        self.started = time.time()
+
+    def timer(self, name):
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, name)
+
+    def timed(self, name, func, *args):
+        if not self.enabled:
+            return func(*args)
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name, seconds):
+        with self.lock:
+            histogram = self.timers.get(name)
+            if histogram is None:
+                histogram = self.timers[name] = LatencyHistogram(self.window)
+            histogram.record(seconds)
+
+    def increment(self, name, amount=1):
+        if not self.enabled:
+            return
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def reset(self):
+        with self.lock:
+            self.timers = {}
+            self.counters = {}
+            self.started = time.time()
+
+    def snapshot(self):
+        with self.lock:
+            timers = {name: histogram.snapshot() for name, histogram in self.timers.items()}
+            counters = dict(self.counters)
+        return {"time": time.time(), "since": self.started, "timers": timers, "counters": counters}
+
+    def format(self):
+        snapshot = self.snapshot()
+        lines = [f"{'Stage':<20}{'Count':>8}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}"]
+        for name, stats in sorted(snapshot["timers"].items()):
+            lines.append(f"{name:<20}{stats['count']:>8}{stats['p50'] * 1000:>10.2f}"
+                         f"{stats['p95'] * 1000:>10.2f}{stats['max'] * 1000:>10.2f}")
+        if snapshot["counters"]:
+            lines.append("")
+            lines.append(f"{'Counter':<28}{'Value':>12}")
+            for name, value in sorted(snapshot["counters"].items()):
+                lines.append(f"{name:<28}{value:>12}")
+        return "\n".join(lines)
+
+    def dump(self, path=METRICS_FILE):
+        line = json.dumps(self.snapshot()) + "\n"
+        try:
+            if os.path.exists(path) and os.path.getsize(path) + len(line) > METRICS_MAX_BYTES:
+                self._rotate(path)
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(line)
+            return path
+        except Exception as e:
+            logger.error("Error writing metrics: %s", e)
+            return None
+
+    def _rotate(self, path):
+        for index in range(METRICS_BACKUPS - 1, 0, -1):
+            source = f"{path}.{index}"
+            if os.path.exists(source):
+                os.replace(source, f"{path}.{index + 1}")
+        os.replace(path, f"{path}.1")
+
+
+metrics = Metrics()
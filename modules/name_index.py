@@ -0,0 +1,135 @@
+import re
+import unicodedata
+
+NGRAM_SIZE = 3
+MAX_DISTANCE = 2
+MEMO_SIZE = 4096
+
+_WHITESPACE = re.compile(r"[\s_]+")
+_COPY_SUFFIX = re.compile(r"(?:(?:\s+-?\s*|\s*-\s*)copy|\s*\(\d+\))+$")
+_DIGITS = re.compile(r"\d+")
+
+
+def normalize_name(name):
+    name = unicodedata.normalize("NFKC", name).casefold()
+    name = _WHITESPACE.sub(" ", name).strip()
+    return _COPY_SUFFIX.sub("", name).strip()
+
+
+def ngrams(key, size=NGRAM_SIZE):
+    padded = "\x02" * (size - 1) + key + "\x03" * (size - 1)
+    return {padded[i:i + size] for i in range(len(padded) - size + 1)}
+
+
+def bounded_distance(a, b, limit):
+    if abs(len(a) - len(b)) > limit:
+        return None
+    if len(a) > len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        row_min = i
+        for j, char_b in enumerate(b, 1):
+            cost = previous[j - 1] + (char_a != char_b)
+            value = min(previous[j] + 1, current[j - 1] + 1, cost)
+            current.append(value)
+            if value < row_min:
+                row_min = value
+        if row_min > limit:
+            return None
+        previous = current
+    return previous[-1] if previous[-1] <= limit else None
+
+
+class ScenarioNameIndex:
+    def __init__(self, names=(), max_distance=MAX_DISTANCE):
+        self.max_distance = max_distance
+        self.canonical = {}
+        self.postings = {}
+        self.by_length = {}
+        self.memo = {}
+        self.add_many(names)
+
+    def __len__(self):
+        return len(self.canonical)
+
+    def __contains__(self, name):
+        return normalize_name(name) in self.canonical
+
+    def add_many(self, names):
+        for name in names:
+            key = normalize_name(name)
+            if not key or key in self.canonical:
+                continue
+            self.canonical[key] = name
+            self.by_length.setdefault(len(key), []).append(key)
+            for gram in ngrams(key):
+                self.postings.setdefault(gram, set()).add(key)
+        self.memo.clear()
+
+    def exact(self, name):
+        return self.canonical.get(normalize_name(name))
+
+    def match(self, name):
+        if name in self.memo:
+            return self.memo[name]
+        if len(self.memo) >= MEMO_SIZE:
+            self.memo.clear()
+        result = self._match(name)
+        self.memo[name] = result
+        return result
+
+    def _match(self, name):
+        key = normalize_name(name)
+        if not key:
+            return None
+        if key in self.canonical:
+            return self.canonical[key]
+
+        limit = min(self.max_distance, len(key) // 4)
+        if limit == 0:
+            return None
+
+        digits = _DIGITS.findall(key)
+        best = None
+        best_rank = None
+        for candidate in self._candidates(key, limit):
+            distance = bounded_distance(key, candidate, limit)
+            if distance is None or _DIGITS.findall(candidate) != digits:
+                continue
+            rank = (distance, abs(len(candidate) - len(key)), candidate)
+            if best_rank is None or rank < best_rank:
+                best, best_rank = candidate, rank
+        return self.canonical[best] if best is not None else None
+
+    def _candidates(self, key, limit):
+        grams = sorted(ngrams(key), key=lambda gram: len(self.postings.get(gram, ())))
+        required = len(grams) - NGRAM_SIZE * limit
+        if required <= 0:
+            candidates = set()
+            for length in range(len(key) - limit, len(key) + limit + 1):
+                candidates.update(self.by_length.get(length, ()))
+            yield from candidates
+            return
+
+        prefix_length = len(grams) - required + 1
+        hits = {}
+        for gram in grams[:prefix_length]:
+            for candidate in self.postings.get(gram, ()):
+                hits[candidate] = hits.get(candidate, 0) + 1
+
+        postings = [self.postings.get(gram, ()) for gram in grams[prefix_length:]]
+        missing_allowed = len(grams) - required
+        low, high = len(key) - limit, len(key) + limit
+        for candidate, count in hits.items():
+            if not low <= len(candidate) <= high:
+                continue
+            missing = prefix_length - count
+            for posting in postings:
+                if missing > missing_allowed:
+                    break
+                if candidate not in posting:
+                    missing += 1
+            if missing <= missing_allowed:
+                yield candidate
@@ -1,109 +1,225 @@
-import requests
 import json
 import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 
+from modules.log import get_logger
+from modules.score_cache import SCORE_CACHE_FILE, ScoreCache
+from modules.leaderboard import LeaderboardRanks
+from modules.name_index import ScenarioNameIndex
+
+logger = get_logger("online_api")
+
+BASE_URL = "https://kovaaks.com/webapp-backend"
+
 
 class OnlineScoreAPI:
     CACHE_DIR = os.path.expanduser(os.path.join("~", ".kovaaks_cache"))
     CACHE_TTL = timedelta(weeks=1)
-
-    def __init__(self):
-        self.base_url = "https://kovaaks.com/webapp-backend"
+    FRIEND_CACHE_TTL = timedelta(hours=6)
+    WRITE_DELAY = 5
+    MTIME_CHECK_INTERVAL = 30
+    MAX_WORKERS = 8
+    FRIEND_WORKERS = 4
+
+    def __init__(self, base_url=BASE_URL):
+        self.base_url = base_url
+        self.session = None
         os.makedirs(self.CACHE_DIR, exist_ok=True)
+        self.cache = ScoreCache(os.path.join(self.CACHE_DIR, SCORE_CACHE_FILE))
+        self.leaderboards = LeaderboardRanks(self, self.CACHE_DIR)
 
         self.local_scores_file = "online_highscores.json"
-
-    def _cache_path(self, username):
+        self.local_scores = None
+        self.local_scores_mtime = None
+        self.local_scores_checked = 0
+        self.local_scores_dirty = False
+        self.local_scores_username = None
+        self.scores_lock = threading.RLock()
+        self.write_timer = None
+        self.refreshing = set()
+        self.name_index = ScenarioNameIndex()
+        self.name_index_names = set()
+        self.name_index_sources = ()
+
+    def _legacy_cache_path(self, username):
         safe_user = username.replace("/", "_")
         return os.path.join(self.CACHE_DIR, f"{safe_user}_scores.json")
 
-    def _load_cache(self, username):
-        path = self._cache_path(username)
+    def _import_legacy_cache(self, username):
+        path = self._legacy_cache_path(username)
         if not os.path.exists(path):
             return None
         try:
             with open(path, 'r', encoding='utf-8') as f:
                 data = json.load(f)
-            fetched_at_str = data.get('fetched_at')
-            if not fetched_at_str:
-                return None
-            fetched_at = datetime.fromisoformat(fetched_at_str)
+            fetched_at = datetime.fromisoformat(data['fetched_at'])
             if fetched_at.tzinfo is None:
                 fetched_at = fetched_at.replace(tzinfo=timezone.utc)
-            if datetime.now(timezone.utc) - fetched_at < self.CACHE_TTL:
-                return data.get('scores', {})
-        except Exception:
-            pass
-        return None
-
-    def _save_cache(self, username, scores):
-        path = self._cache_path(username)
-        data = {
-            'fetched_at': datetime.now(timezone.utc).isoformat(),
-            'scores': scores
-        }
-        try:
-            with open(path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2)
-        except Exception:
-            pass
+            self.cache.put(username, data.get('scores', {}), self.CACHE_TTL.total_seconds(), fetched_at.timestamp())
+            os.remove(path)
+        except Exception as e:
+            logger.error("Error importing cached scores for %s: %s", username, e)
+        return self.cache.get(username)
+
+    def _load_cache(self, username):
+        entry = self.cache.get(username)
+        if entry is None:
+            entry = self._import_legacy_cache(username)
+        return entry
+
+    def _save_cache(self, username, scores, ttl=None):
+        self.cache.put(username, scores, (ttl or self.CACHE_TTL).total_seconds())
 
     def load_local_scores(self):
+        with self.scores_lock:
+            now = time.monotonic()
+            if self.local_scores is not None and now - self.local_scores_checked < self.MTIME_CHECK_INTERVAL:
+                return self.local_scores
+            self.local_scores_checked = now
+
+            mtime = self._local_scores_mtime()
+            if self.local_scores is not None and (mtime == self.local_scores_mtime or self.local_scores_dirty):
+                return self.local_scores
+
+            self.local_scores = self._read_local_scores()
+            self.local_scores_mtime = mtime
+            return self.local_scores
+
+    def _local_scores_mtime(self):
+        try:
+            return os.stat(self.local_scores_file).st_mtime_ns
+        except OSError:
+            return None
+
+    def _read_local_scores(self):
         if os.path.exists(self.local_scores_file):
             try:
                 with open(self.local_scores_file, 'r', encoding='utf-8') as f:
                     data = json.load(f)
                 return data.get('scores', {})
             except Exception as e:
-                print(f"Error loading local scores: {e}")
+                logger.error("Error loading local scores: %s", e)
         return {}
 
     def save_local_scores(self, scores, username):
-        data = {
-            'username': username,
-            'last_updated': datetime.now().isoformat(),
-            'scores': scores
-        }
-        try:
-            with open(self.local_scores_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2)
-            print(f"Saved {len(scores)} scores to local file")
-        except Exception as e:
-            print(f"Error saving local scores: {e}")
+        with self.scores_lock:
+            self.local_scores = scores
+            self.local_scores_username = username
+            self.local_scores_dirty = True
+            if self.write_timer is None:
+                self.write_timer = threading.Timer(self.WRITE_DELAY, self.flush_local_scores)
+                self.write_timer.daemon = True
+                self.write_timer.start()
+
+    def flush_local_scores(self):
+        with self.scores_lock:
+            if self.write_timer is not None:
+                self.write_timer.cancel()
+                self.write_timer = None
+            if not self.local_scores_dirty:
+                return
+            data = {
+                'username': self.local_scores_username,
+                'last_updated': datetime.now().isoformat(),
+                'scores': self.local_scores
+            }
+            temp_path = self.local_scores_file + ".tmp"
+            try:
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    json.dump(data, f)
+                os.replace(temp_path, self.local_scores_file)
+                self.local_scores_dirty = False
+                self.local_scores_mtime = self._local_scores_mtime()
+                logger.debug("Saved %s scores to local file", len(self.local_scores))
+            except Exception as e:
+                logger.error("Error saving local scores: %s", e)
 
     def update_local_score(self, scenario_name, new_score, username):
         local_scores = self.load_local_scores()
         current_score = local_scores.get(scenario_name, 0)
 
         if new_score > current_score:
-            local_scores[scenario_name] = new_score
-            self.save_local_scores(local_scores, username)
-            print(f"Updated local score for '{scenario_name}': {current_score} -> {new_score}")
+            updated = dict(local_scores)
+            updated[scenario_name] = new_score
+            self.save_local_scores(updated, username)
+            logger.info("Updated local score for '%s': %s -> %s", scenario_name, current_score, new_score)
             return True
         return False
 
-    def fetch_all_pages(self, username, max_per_page=100):
+    def _get_session(self):
+        if self.session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+
+            retry = Retry(
+                total=4,
+                backoff_factor=0.5,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=("GET",),
+                raise_on_status=False
+            )
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.MAX_WORKERS * self.FRIEND_WORKERS,
+                                  max_retries=retry)
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            self.session = session
+        return self.session
+
+    def _fetch_page(self, username, page, max_per_page):
+        import requests
+
         url = f"{self.base_url}/user/scenario/total-play"
-        all_data = []
-        page = 0
-        while True:
-            params = {
-                "username": username,
-                "page": page,
-                "max": max_per_page,
-                "sort_param[]": "count"
-            }
-            resp = requests.get(url, params=params, timeout=10)
+        params = {
+            "username": username,
+            "page": page,
+            "max": max_per_page,
+            "sort_param[]": "count"
+        }
+        try:
+            resp = self._get_session().get(url, params=params, timeout=10)
             if resp.status_code != 200:
-                break
-            data = resp.json().get('data', [])
-            if not data:
-                break
-            all_data.extend(data)
-            if len(data) < max_per_page:
-                break
-            page += 1
+                return None
+            return resp.json()
+        except (requests.RequestException, ValueError) as e:
+            logger.error("Error fetching page %s for %s: %s", page, username, e)
+            return None
+
+    def fetch_all_pages(self, username, max_per_page=100):
+        first = self._fetch_page(username, 0, max_per_page)
+        if not first:
+            return None
+        all_data = list(first.get('data', []))
+        if len(all_data) < max_per_page:
+            return all_data
+
+        total = first.get('total')
+        if not isinstance(total, int):
+            page = 1
+            while True:
+                result = self._fetch_page(username, page, max_per_page)
+                if result is None:
+                    logger.warning("Page %s for %s failed, discarding partial fetch", page, username)
+                    return None
+                data = result.get('data', [])
+                all_data.extend(data)
+                if len(data) < max_per_page:
+                    break
+                page += 1
+            return all_data
+
+        page_count = -(-total // max_per_page)
+        with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as pool:
+            results = pool.map(lambda page: self._fetch_page(username, page, max_per_page), range(1, page_count))
+            for page, result in enumerate(results, 1):
+                if result is None:
+                    logger.warning("Page %s for %s failed, discarding partial fetch", page, username)
+                    return None
+                all_data.extend(result.get('data', []))
         return all_data
 
     def extract_highest_scores(self, entries):
@@ -123,27 +239,57 @@ class OnlineScoreAPI:
         if not username:
             return {}
 
-
         local_scores = self.load_local_scores()
 
-
         cached = self._load_cache(username)
         if cached is not None:
+            scores = cached.scores
+            if not local_scores or len(scores) > len(local_scores):
+                self.save_local_scores(scores, username)
+            if not cached.is_fresh():
+                self.refresh_in_background(username, scores)
+            return scores
+
+        self.refresh_in_background(username)
+        return local_scores
+
+    def refresh_in_background(self, username, cached_scores=None):
+        if not self._claim_refresh(username):
+            return
+        thread = threading.Thread(target=self._refresh_scores, args=(username, cached_scores), daemon=True)
+        thread.start()
+
+    def _claim_refresh(self, username):
+        with self.scores_lock:
+            if username in self.refreshing:
+                return False
+            self.refreshing.add(username)
+            return True
 
-            if not local_scores or len(cached) > len(local_scores):
-                self.save_local_scores(cached, username)
-            return cached
-
-
-        print(f"Fetching online scores for user: {username}")
-        entries = self.fetch_all_pages(username)
-        scores = self.extract_highest_scores(entries)
-
-
-        self._save_cache(username, scores)
-        self.save_local_scores(scores, username)
-
-        return scores
+    def _refresh_scores(self, username, cached_scores, ttl=None, own=True):
+        try:
+            logger.info("%s online scores for user: %s", "Refreshing" if cached_scores else "Fetching", username)
+            entries = self.fetch_all_pages(username)
+            if not entries:
+                return
+            scores = dict(cached_scores or {})
+            for scenario, score in self.extract_highest_scores(entries).items():
+                scores[scenario] = max(scores.get(scenario, 0), score)
+
+            self._save_cache(username, scores, ttl)
+            if not own:
+                return
+            self.leaderboards.update_from_entries(entries)
+
+            local_scores = dict(self.load_local_scores())
+            for scenario, score in scores.items():
+                local_scores[scenario] = max(local_scores.get(scenario, 0), score)
+            self.save_local_scores(local_scores, username)
+        except Exception as e:
+            logger.error("Error refreshing online scores for %s: %s", username, e)
+        finally:
+            with self.scores_lock:
+                self.refreshing.discard(username)
 
     def get_online_score(self, username, scenario_name):
         if not username or not scenario_name:
@@ -154,9 +300,14 @@ class OnlineScoreAPI:
         if scenario_name in local_scores:
             return local_scores[scenario_name]
 
-
         all_scores = self.fetch_user_scenario_scores(username)
-        return all_scores.get(scenario_name)
+        if scenario_name in all_scores:
+            return all_scores[scenario_name]
+
+        canonical = self.match_scenario(username, scenario_name, fuzzy=False)
+        if canonical is None:
+            return None
+        return local_scores.get(canonical, all_scores.get(canonical))
 
     def is_scenario_available_online(self, username, scenario_name):
         if not username or not scenario_name:
@@ -167,6 +318,62 @@ class OnlineScoreAPI:
         if scenario_name in local_scores:
             return True
 
+        return self.match_scenario(username, scenario_name) is not None
+
+    def match_scenario(self, username, scenario_name, fuzzy=True):
+        with self.scores_lock:
+            local_scores = self.load_local_scores()
+            cached = self._load_cache(username) if username else None
+            if cached is None and not local_scores:
+                self.fetch_user_scenario_scores(username)
+                local_scores = self.load_local_scores()
+                cached = self._load_cache(username)
+
+            sources = (local_scores, cached)
+            if len(sources) != len(self.name_index_sources) or any(
+                    new is not old for new, old in zip(sources, self.name_index_sources)):
+                names = set(local_scores)
+                if cached is not None:
+                    names.update(cached.scores)
+                new_names = names - self.name_index_names
+                if new_names:
+                    self.name_index.add_many(new_names)
+                    self.name_index_names.update(new_names)
+                self.name_index_sources = sources
+            if fuzzy:
+                return self.name_index.match(scenario_name)
+            return self.name_index.exact(scenario_name)
+
+    def fetch_friends_scores(self, usernames):
+        stale = [username for username in usernames
+                 if username and not self.cache.is_fresh(username) and self._claim_refresh(username)]
+        if not stale:
+            return
+        with ThreadPoolExecutor(max_workers=min(self.FRIEND_WORKERS, len(stale))) as pool:
+            list(pool.map(self._refresh_friend, stale))
+
+    def _refresh_friend(self, username):
+        cached = self._load_cache(username)
+        self._refresh_scores(username, cached.scores if cached else None, self.FRIEND_CACHE_TTL, own=False)
+
+    def refresh_friends_in_background(self, usernames):
+        usernames = [username for username in usernames if username]
+        if usernames:
+            threading.Thread(target=self.fetch_friends_scores, args=(usernames,), daemon=True).start()
+
+    def get_friend_scores(self, usernames, scenario_name):
+        scores = self.cache.scores_for(scenario_name)
+        return {username: scores[username] for username in usernames if username in scores}
+
+    def best_friend_score(self, usernames, scenario_name):
+        scores = self.get_friend_scores(usernames, scenario_name)
+        if not scores:
+            return None
+        username = max(scores, key=scores.get)
+        return username, scores[username]
+
+    def get_rank(self, username, scenario_name):
+        return self.leaderboards.lookup(username, scenario_name)
 
-        scores = self.fetch_user_scenario_scores(username)
-        return scenario_name in scores
\ No newline at end of file
+    def prefetch_ranks(self, username, scenario_names):
+        self.leaderboards.prefetch(username, list(scenario_names) + self.leaderboards.most_played())
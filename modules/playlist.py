@@ -0,0 +1,61 @@
+import os
+import json
+
+from modules.log import get_logger
+
+logger = get_logger("playlist")
+
+PLAYLIST_FILE = os.path.join("Saved", "SaveGames", "PlaylistInProgress.json")
+
+_playlists = {}
+
+
+class Playlist:
+    def __init__(self, name, share_code, scenarios):
+        self.name = name
+        self.share_code = share_code
+        self.scenarios = scenarios
+
+    @classmethod
+    def from_json(cls, data):
+        scenarios = [entry.get("scenario_name") for entry in data.get("scenarioList", [])
+                     if isinstance(entry, dict) and entry.get("scenario_name")]
+        return cls(data.get("playlistName"), data.get("shareCode") or None, scenarios)
+
+    def position(self, scenario_name):
+        try:
+            return self.scenarios.index(scenario_name)
+        except ValueError:
+            return None
+
+    def upcoming(self, scenario_name):
+        index = self.position(scenario_name)
+        if index is None:
+            return list(self.scenarios)
+        return self.scenarios[index + 1:] + self.scenarios[:index]
+
+
+def load_playlist(installation_path):
+    if not installation_path:
+        return None
+    playlist_file = os.path.join(installation_path, PLAYLIST_FILE)
+    try:
+        mtime = os.stat(playlist_file).st_mtime_ns
+    except OSError:
+        _playlists.pop(playlist_file, None)
+        return None
+
+    cached = _playlists.get(playlist_file)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    try:
+        with open(playlist_file, 'r', encoding='utf-8-sig') as f:
+            playlist = Playlist.from_json(json.load(f))
+        logger.debug("Loaded playlist '%s' with %s scenarios", playlist.name, len(playlist.scenarios))
+    except Exception as e:
+        logger.error("Error reading playlist file: %s", e)
+        playlist = None
+
+    _playlists[playlist_file] = (mtime, playlist)
+    return playlist
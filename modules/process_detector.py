@@ -0,0 +1,48 @@
+import threading
+import psutil
+
+from modules.kovaaks_utils import find_kovaaks_process
+from modules.log import get_logger
+
+logger = get_logger("process_detector")
+
+
+class ProcessDetector:
+    def __init__(self, finder=find_kovaaks_process):
+        self.finder = finder
+        self.process = None
+        self.running = False
+        self.lock = threading.Lock()
+        self.start_callbacks = []
+        self.stop_callbacks = []
+
+    def subscribe(self, on_start=None, on_stop=None):
+        if on_start:
+            self.start_callbacks.append(on_start)
+        if on_stop:
+            self.stop_callbacks.append(on_stop)
+
+    def is_running(self):
+        with self.lock:
+            if self.process is not None:
+                try:
+                    if self.process.is_running():
+                        return True
+                except psutil.Error:
+                    pass
+                self.process = None
+            self.process = self.finder()
+            return self.process is not None
+
+    def poll(self):
+        running = self.is_running()
+        if running == self.running:
+            return running
+        self.running = running
+        callbacks = self.start_callbacks if running else self.stop_callbacks
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.error("Error in process callback: %s", e)
+        return running
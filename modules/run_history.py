@@ -0,0 +1,174 @@
+import os
+import sqlite3
+
+from modules.kovaaks_utils import scenario_from_filename
+from modules.ingest import PARALLEL_THRESHOLD, default_workers, ingest_runs, parse_run
+from modules.metrics import metrics
+from modules.log import get_logger
+
+logger = get_logger("run_history")
+
+HISTORY_FILE = "run_history.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    file_name TEXT PRIMARY KEY,
+    scenario TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    score REAL NOT NULL,
+    accuracy REAL,
+    kills INTEGER,
+    fight_time REAL,
+    sensitivity REAL,
+    sens_scale TEXT,
+    size INTEGER NOT NULL,
+    mtime INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_scenario_score ON runs (scenario, score);
+CREATE INDEX IF NOT EXISTS runs_scenario_timestamp ON runs (scenario, timestamp);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+INSERT_RUN = """
+INSERT OR REPLACE INTO runs
+    (file_name, scenario, timestamp, score, accuracy, kills, fight_time, sensitivity, sens_scale, size, mtime)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+class RunHistory:
+    def __init__(self, stats_directory, database=HISTORY_FILE):
+        self.stats_directory = stats_directory
+        self.database = database
+        self.db = sqlite3.connect(database, check_same_thread=False)
+        self.db.executescript(SCHEMA)
+        if self._get_meta('stats_directory') != stats_directory:
+            with self.db:
+                self.db.execute("DELETE FROM runs")
+                self._set_meta('stats_directory', stats_directory)
+                self._set_meta('dir_mtime', None)
+
+    def close(self):
+        self.db.close()
+
+    def _get_meta(self, key):
+        row = self.db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key, value):
+        self.db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def _run_row(self, file_name, file_path, size, mtime):
+        if scenario_from_filename(file_name) is not None:
+            metrics.increment("stats_files_scanned")
+        return parse_run(file_name, file_path, size, mtime)
+
+    def sync(self, progress=None, cancel=None, workers=None):
+        try:
+            dir_mtime = str(os.stat(self.stats_directory).st_mtime_ns)
+        except OSError:
+            return []
+        if dir_mtime == self._get_meta('dir_mtime'):
+            return []
+
+        known = {name: (size, mtime) for name, size, mtime in self.db.execute(
+            "SELECT file_name, size, mtime FROM runs")}
+        pending = []
+        new_files = set()
+        with os.scandir(self.stats_directory) as entries:
+            for entry in entries:
+                if not entry.name.endswith(".csv"):
+                    continue
+                stat = entry.stat()
+                signature = (stat.st_size, stat.st_mtime_ns)
+                previous = known.get(entry.name)
+                if previous == signature:
+                    continue
+                pending.append((entry.name, entry.path) + signature)
+                if previous is None:
+                    new_files.add(entry.name)
+
+        workers = workers or default_workers()
+        if len(pending) >= PARALLEL_THRESHOLD and workers > 1:
+            new_runs, complete = self._ingest_parallel(pending, new_files, progress, cancel, workers)
+        else:
+            new_runs, complete = self._ingest_serial(pending, new_files, cancel)
+
+        with self.db:
+            self._set_meta('dir_mtime', dir_mtime if complete else None)
+        return new_runs
+
+    def _ingest_serial(self, pending, new_files, cancel=None):
+        rows = []
+        complete = True
+        for file_name, file_path, size, mtime in pending:
+            if cancel is not None and cancel.is_set():
+                logger.info("Stats ingestion cancelled after %s of %s files", len(rows), len(pending))
+                complete = False
+                break
+            row = self._run_row(file_name, file_path, size, mtime)
+            if row is None:
+                complete = complete and scenario_from_filename(file_name) is None
+                continue
+            rows.append(row)
+        with self.db:
+            self.db.executemany(INSERT_RUN, rows)
+        return [(row[0], row[-1]) for row in rows if row[0] in new_files], complete
+
+    def _ingest_parallel(self, pending, new_files, progress, cancel, workers):
+        new_runs = []
+        ingested = 0
+        complete = True
+        for rows, failed in ingest_runs(pending, workers, progress=progress, cancel=cancel):
+            with self.db:
+                self.db.executemany(INSERT_RUN, rows)
+            new_runs.extend((row[0], row[-1]) for row in rows if row[0] in new_files)
+            ingested += len(rows) + failed
+            complete = complete and not failed
+        metrics.increment("stats_files_scanned", ingested)
+        return new_runs, complete and ingested == len(pending)
+
+    def add_file(self, file_path):
+        file_name = os.path.basename(file_path)
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        row = self._run_row(file_name, file_path, stat.st_size, stat.st_mtime_ns)
+        if row is None:
+            return None
+        with self.db:
+            self.db.execute(INSERT_RUN, row)
+        return row[1], row[3]
+
+    def has_run(self, file_name):
+        return self.db.execute("SELECT 1 FROM runs WHERE file_name = ?", (file_name,)).fetchone() is not None
+
+    def best(self, scenario_name, since=None):
+        if since is None:
+            row = self.db.execute("SELECT MAX(score) FROM runs WHERE scenario = ?", (scenario_name,)).fetchone()
+        else:
+            row = self.db.execute("SELECT MAX(score) FROM runs WHERE scenario = ? AND timestamp >= ?",
+                                  (scenario_name, since)).fetchone()
+        return round(row[0], 1) if row[0] is not None else 0
+
+    def session_best(self, scenario_name, session_start):
+        return self.best(scenario_name, since=session_start)
+
+    def run_count(self, scenario_name):
+        return self.db.execute("SELECT COUNT(*) FROM runs WHERE scenario = ?", (scenario_name,)).fetchone()[0]
+
+    def runs_since(self, scenario_name, rowid=0):
+        return self.db.execute("SELECT rowid, timestamp, score, accuracy FROM runs "
+                               "WHERE scenario = ? AND rowid > ? ORDER BY rowid", (scenario_name, rowid)).fetchall()
+
+    def percentile(self, scenario_name, score):
+        total = self.run_count(scenario_name)
+        if not total:
+            return None
+        below = self.db.execute("SELECT COUNT(*) FROM runs WHERE scenario = ? AND score < ?",
+                                (scenario_name, score)).fetchone()[0]
+        return below / total * 100
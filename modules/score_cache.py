@@ -0,0 +1,125 @@
+import os
+import json
+import time
+import threading
+from collections import OrderedDict
+
+from modules.log import get_logger
+
+logger = get_logger("score_cache")
+
+SCORE_CACHE_FILE = "scores_cache.json"
+DEFAULT_TTL = 7 * 24 * 60 * 60
+MAX_CACHE_BYTES = 8 * 1024 * 1024
+
+
+class CacheEntry:
+    __slots__ = ("scores", "fetched_at", "ttl", "size")
+
+    def __init__(self, scores, fetched_at, ttl):
+        self.scores = scores
+        self.fetched_at = fetched_at
+        self.ttl = ttl
+        self.size = len(json.dumps(scores))
+
+    def is_fresh(self, now=None):
+        return (now or time.time()) - self.fetched_at < self.ttl
+
+
+class ScoreCache:
+    def __init__(self, path, max_bytes=MAX_CACHE_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.by_scenario = {}
+        self.total_size = 0
+        self.lock = threading.RLock()
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            users = sorted(data.get('users', {}).items(), key=lambda item: item[1].get('last_used', 0))
+            for username, entry in users:
+                self._insert(username, CacheEntry(entry.get('scores', {}), entry.get('fetched_at', 0),
+                                                  entry.get('ttl', DEFAULT_TTL)))
+        except Exception as e:
+            logger.error("Error loading score cache: %s", e)
+
+    def save(self):
+        with self.lock:
+            now = time.time()
+            count = len(self.entries)
+            users = {}
+            for index, (username, entry) in enumerate(self.entries.items()):
+                users[username] = {
+                    'fetched_at': entry.fetched_at,
+                    'ttl': entry.ttl,
+                    'last_used': now - (count - index),
+                    'scores': entry.scores
+                }
+            temp_path = self.path + ".tmp"
+            try:
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    json.dump({'users': users}, f)
+                os.replace(temp_path, self.path)
+            except Exception as e:
+                logger.error("Error saving score cache: %s", e)
+
+    def get(self, username):
+        with self.lock:
+            entry = self.entries.get(username)
+            if entry is not None:
+                self.entries.move_to_end(username)
+            return entry
+
+    def is_fresh(self, username):
+        entry = self.get(username)
+        return entry is not None and entry.is_fresh()
+
+    def put(self, username, scores, ttl=DEFAULT_TTL, fetched_at=None):
+        with self.lock:
+            self._remove(username)
+            self._insert(username, CacheEntry(scores, fetched_at or time.time(), ttl))
+            self._evict()
+        self.save()
+
+    def remove(self, username):
+        with self.lock:
+            self._remove(username)
+        self.save()
+
+    def scores_for(self, scenario_name):
+        with self.lock:
+            return dict(self.by_scenario.get(scenario_name, {}))
+
+    def usernames(self):
+        with self.lock:
+            return list(self.entries)
+
+    def _insert(self, username, entry):
+        self.entries[username] = entry
+        self.total_size += entry.size
+        for scenario, score in entry.scores.items():
+            self.by_scenario.setdefault(scenario, {})[username] = score
+
+    def _remove(self, username):
+        entry = self.entries.pop(username, None)
+        if entry is None:
+            return
+        self.total_size -= entry.size
+        for scenario in entry.scores:
+            users = self.by_scenario.get(scenario)
+            if users is not None:
+                users.pop(username, None)
+                if not users:
+                    del self.by_scenario[scenario]
+
+    def _evict(self):
+        while self.total_size > self.max_bytes and len(self.entries) > 1:
+            username = next(iter(self.entries))
+            logger.debug("Evicting cached scores for %s", username)
+            self._remove(username)
@@ -2,6 +2,10 @@ import os
 import sys
 import win32com.client
 
+from modules.log import get_logger
+
+logger = get_logger("startup_utils")
+
 
 def get_app_executable_path():
     if getattr(sys, 'frozen', False):
@@ -36,4 +40,4 @@ def set_startup_shortcut(enable: bool):
             try:
                 os.remove(shortcut_path)
             except Exception as e:
-                print(f"Error deleting startup shortcut: {e}")
\ No newline at end of file
+                logger.error("Error deleting startup shortcut: %s", e)
\ No newline at end of file
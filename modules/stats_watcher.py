@@ -0,0 +1,221 @@
+import os
+import sys
+import struct
+import threading
+
+from modules.log import get_logger
+
+logger = get_logger("stats_watcher")
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+EVENT_HEADER = struct.Struct("iIII")
+
+
+def is_stats_file(file_name):
+    return file_name.endswith(".csv")
+
+
+class StatsWatcher:
+    def __init__(self, directory, callback):
+        self.directory = directory
+        self.callback = callback
+        self.thread = None
+        self.stop_event = threading.Event()
+        self.dir_mtime = None
+        self.known = {}
+        self.pending = {}
+
+    def start(self):
+        if self.thread:
+            return
+        self.stop_event.clear()
+        self._snapshot()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        self._wake()
+        if self.thread:
+            self.thread.join(timeout=1)
+            self.thread = None
+
+    def _run(self):
+        raise NotImplementedError
+
+    def _wake(self):
+        pass
+
+    def _deliver(self, file_path):
+        try:
+            handled = self.callback(file_path)
+        except Exception as e:
+            logger.error("Error handling stats file %s: %s", file_path, e)
+            handled = True
+        return handled is not False
+
+    def _signature(self, file_path):
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def _snapshot(self):
+        self.known = {}
+        self.pending = {}
+        try:
+            self.dir_mtime = os.stat(self.directory).st_mtime_ns
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    if is_stats_file(entry.name):
+                        self.known[entry.name] = True
+        except OSError as e:
+            logger.error("Error reading stats directory: %s", e)
+
+    def _scan(self):
+        for file_name, signature in list(self.pending.items()):
+            file_path = os.path.join(self.directory, file_name)
+            current = self._signature(file_path)
+            if current is None:
+                del self.pending[file_name]
+            elif current != signature:
+                self._offer(file_name, file_path, current)
+
+        try:
+            dir_mtime = os.stat(self.directory).st_mtime_ns
+        except OSError:
+            return
+        if dir_mtime == self.dir_mtime:
+            return
+        self.dir_mtime = dir_mtime
+
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if not is_stats_file(entry.name) or entry.name in self.known:
+                    continue
+                self.known[entry.name] = True
+                self._offer(entry.name, entry.path, self._signature(entry.path))
+
+    def _offer(self, file_name, file_path, signature):
+        if self._deliver(file_path):
+            self.pending.pop(file_name, None)
+        else:
+            self.pending[file_name] = signature
+
+
+class PollingWatcher(StatsWatcher):
+    def __init__(self, directory, callback, interval=0.5):
+        super().__init__(directory, callback)
+        self.interval = interval
+
+    def _run(self):
+        while not self.stop_event.wait(self.interval):
+            try:
+                self._scan()
+            except Exception as e:
+                logger.error("Error polling stats directory: %s", e)
+
+
+class InotifyWatcher(StatsWatcher):
+    def __init__(self, directory, callback):
+        super().__init__(directory, callback)
+        import ctypes
+        import ctypes.util
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        watch = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), IN_CLOSE_WRITE | IN_MOVED_TO)
+        if watch < 0:
+            os.close(self.fd)
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {directory}")
+        self.wake_r, self.wake_w = os.pipe()
+
+    def _wake(self):
+        try:
+            os.write(self.wake_w, b"\0")
+        except OSError:
+            pass
+
+    def _run(self):
+        import select
+        try:
+            while not self.stop_event.is_set():
+                readable, _, _ = select.select([self.fd, self.wake_r], [], [])
+                if self.fd not in readable:
+                    continue
+                try:
+                    buffer = os.read(self.fd, 64 * 1024)
+                except BlockingIOError:
+                    continue
+                self._handle_events(buffer)
+        finally:
+            for fd in (self.fd, self.wake_r, self.wake_w):
+                if fd is not None:
+                    os.close(fd)
+            self.fd = self.wake_r = self.wake_w = None
+
+    def _handle_events(self, buffer):
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(buffer):
+            _, mask, _, name_len = EVENT_HEADER.unpack_from(buffer, offset)
+            offset += EVENT_HEADER.size
+            name = buffer[offset:offset + name_len].rstrip(b"\0").decode("utf-8", errors="replace")
+            offset += name_len
+            if mask & IN_Q_OVERFLOW:
+                self._scan()
+            elif is_stats_file(name):
+                self.known[name] = True
+                self._deliver(os.path.join(self.directory, name))
+
+
+class WindowsWatcher(StatsWatcher):
+    def __init__(self, directory, callback):
+        super().__init__(directory, callback)
+        import win32event
+        import win32file
+        import win32con
+        self.win32event = win32event
+        self.win32file = win32file
+        self.notify_filter = win32con.FILE_NOTIFY_CHANGE_FILE_NAME | win32con.FILE_NOTIFY_CHANGE_LAST_WRITE
+        self.stop_handle = win32event.CreateEvent(None, True, False, None)
+
+    def _wake(self):
+        self.win32event.SetEvent(self.stop_handle)
+
+    def start(self):
+        self.win32event.ResetEvent(self.stop_handle)
+        super().start()
+
+    def _run(self):
+        change_handle = self.win32file.FindFirstChangeNotification(self.directory, False, self.notify_filter)
+        try:
+            self._scan()
+            while not self.stop_event.is_set():
+                result = self.win32event.WaitForMultipleObjects(
+                    [self.stop_handle, change_handle], False, self.win32event.INFINITE)
+                if result == self.win32event.WAIT_OBJECT_0:
+                    break
+                try:
+                    self._scan()
+                except Exception as e:
+                    logger.error("Error scanning stats directory: %s", e)
+                self.win32file.FindNextChangeNotification(change_handle)
+        finally:
+            self.win32file.FindCloseChangeNotification(change_handle)
+
+
+def create_stats_watcher(directory, callback):
+    try:
+        if sys.platform.startswith("linux"):
+            return InotifyWatcher(directory, callback)
+        if sys.platform == "win32":
+            return WindowsWatcher(directory, callback)
+    except Exception as e:
+        logger.warning("Falling back to polling stats watcher: %s", e)
+    return PollingWatcher(directory, callback)
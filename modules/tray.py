@@ -1,28 +1,51 @@
 import os
-import time
+import hashlib
 import threading
 import sys
-from pypresence import Presence
-import psutil
 import pystray
 from PIL import Image
 
 from modules.config import load_settings, load_or_create_config, save_config, initialize_installation_path, \
     get_resource_path, save_settings
-from modules.kovaaks_utils import is_kovaaks_running, get_current_scenario, find_initial_scores, \
-    find_fight_time_and_score
-from modules.online_api import OnlineScoreAPI
-from modules.discord_rpc import CLIENT_ID, update_presence
-from modules.gui import MainWindow
+from modules.engine import Engine
+from modules.log import get_logger, shutdown_logging
+
+logger = get_logger("tray")
+
+ICON_SIZE = (64, 64)
+ICON_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".kovaaks_cache")
+
+
+def icon_cache_path(icon_path):
+    with open(icon_path, 'rb') as f:
+        digest = hashlib.sha1(f.read()).hexdigest()[:16]
+    return os.path.join(ICON_CACHE_DIR, f"tray_icon_{digest}_{ICON_SIZE[0]}x{ICON_SIZE[1]}.png")
+
+
+def render_icon(icon_path, cache_path):
+    image = Image.open(icon_path).resize(ICON_SIZE, Image.Resampling.LANCZOS)
+    try:
+        os.makedirs(ICON_CACHE_DIR, exist_ok=True)
+        temp_path = cache_path + ".tmp"
+        image.save(temp_path, format="PNG")
+        os.replace(temp_path, cache_path)
+    except Exception as e:
+        logger.error("Error caching tray icon: %s", e)
+    return image
 
 
 def load_icon():
     try:
         icon_path = get_resource_path("kvk_icon.ico")
         if os.path.exists(icon_path):
-            return Image.open(icon_path).resize((64, 64), Image.Resampling.LANCZOS)
+            cache_path = icon_cache_path(icon_path)
+            if os.path.exists(cache_path):
+                image = Image.open(cache_path)
+                image.load()
+                return image
+            return render_icon(icon_path, cache_path)
     except Exception as e:
-        print(f"Error loading icon: {e}")
+        logger.error("Error loading icon: %s", e)
 
     image = Image.new('RGB', (64, 64), color='blue')
     return image
@@ -30,26 +53,33 @@ def load_icon():
 
 class SystemTrayApp:
     def __init__(self):
-        self.online_scores = {}
         self.settings = load_settings()
         self.installation_path = None
         self.config = None
-        self.rpc = None
-        self.rpc_running = False
-        self.monitoring = False
-        self.monitor_thread = None
-        self.current_scenario = None
-        self.checked_files = set()
-        self.local_highscore = 0
-        self.session_highscore = 0
-        self.start_time = None
-        self.online_api = OnlineScoreAPI()
-        self.scenario_played = False
-        self.online_scenario_cache = {}
 
         self.initialize_paths()
+        legacy_checked_files = self.config.pop("checked_files", []) if self.config else []
+        self.engine = Engine(self.settings, self.installation_path, legacy_checked_files)
+        if legacy_checked_files:
+            save_config(self.config)
+        self.engine.add_listener(self.on_engine_state)
         self.create_tray_icon()
 
+    @property
+    def rpc_running(self):
+        return self.engine.rpc_running
+
+    @property
+    def current_scenario(self):
+        return self.engine.current_scenario
+
+    @property
+    def ingest_progress(self):
+        return self.engine.ingest_progress
+
+    def cancel_ingest(self):
+        self.engine.cancel_ingest()
+
     def create_tray_icon(self):
         image = load_icon()
 
@@ -65,6 +95,7 @@ class SystemTrayApp:
 
     def show_main_window(self):
         def run_main():
+            from modules.gui import MainWindow
             app = MainWindow(self.settings, self)
             app.mainloop()
 
@@ -72,189 +103,25 @@ class SystemTrayApp:
         main_thread.start()
 
     def run_tray(self):
-        self.start_monitoring()
+        self.engine.start()
         self.icon.run()
 
-    def start_monitoring(self):
-        if not self.monitoring:
-            self.monitoring = True
-            self.monitor_thread = threading.Thread(target=self.monitor_kovaaks, daemon=True)
-            self.monitor_thread.start()
-
-    def stop_monitoring(self):
-        self.monitoring = False
-        if self.monitor_thread:
-            self.monitor_thread.join(timeout=1)
-
-    def monitor_kovaaks(self):
-        while self.monitoring:
-            if is_kovaaks_running():
-                if not self.rpc_running and not self.settings.get("open_manually", True):
-                    self.start_rpc()
-            else:
-                if self.rpc_running:
-                    self.current_scenario = None
-
-            time.sleep(5)
-
-    def is_scenario_allowed(self, scenario_name):
-        if not self.settings.get("online_only_scenarios", False):
-            return True
-
-        if not scenario_name or scenario_name == "Unknown Scenario":
-            return False
-
-        if scenario_name in self.online_scenario_cache:
-            return self.online_scenario_cache[scenario_name]
-
+    def on_engine_state(self, state):
         try:
-            print(f"Checking online availability for scenario: {scenario_name}")
-            is_available = self.online_api.is_scenario_available_online(
-                self.settings.get("webapp_username"),
-                scenario_name
-            )
-
-            self.online_scenario_cache[scenario_name] = is_available
-
-            if is_available:
-                print(f"Scenario '{scenario_name}' is available online")
-            else:
-                print(f"Scenario '{scenario_name}' is NOT available online - will be filtered out")
-
-            return is_available
-        except Exception as e:
-            print(f"Error checking scenario availability for '{scenario_name}': {e}")
-            return True
+            self.icon.update_menu()
+        except Exception:
+            pass
 
     def start_rpc(self):
-        if self.rpc_running:
-            return
-
-        try:
-            self.rpc = Presence(CLIENT_ID)
-            self.rpc.connect()
-            self.rpc_running = True
-            self.start_time = time.time()
-            self.scenario_played = False
-
-            if self.settings.get("show_online_scores") and self.settings.get("webapp_username"):
-                print("Loading online scores...")
-                self.online_scores = self.online_api.fetch_user_scenario_scores(
-                    self.settings.get("webapp_username")
-                )
-
-            print("Discord RPC started")
-            rpc_thread = threading.Thread(target=self.rpc_update_loop, daemon=True)
-            rpc_thread.start()
-
-        except Exception as e:
-            print(f"Error starting RPC: {e}")
+        self.engine.start_rpc()
 
     def stop_rpc(self):
-        if not self.rpc_running:
-            return
-
-        try:
-            self.rpc_running = False
-            if self.rpc:
-                self.rpc.close()
-                self.rpc = None
-            print("Discord RPC stopped")
-        except Exception as e:
-            print(f"Error stopping RPC: {e}")
-
-    def rpc_update_loop(self):
-        while self.rpc_running and is_kovaaks_running():
-            try:
-                raw_name = get_current_scenario()
-                allowed = self.is_scenario_allowed(raw_name)
-                display_name = raw_name if allowed else "Unknown Scenario"
-
-                if display_name != self.current_scenario:
-                    self.current_scenario = display_name
-                    if allowed:
-                        stats_dir = os.path.join(self.installation_path, "stats")
-                        self.local_highscore, new_files = find_initial_scores(raw_name, stats_dir)
-                        self.checked_files.update(new_files)
-                        self.scenario_played = False
-                        self.session_highscore = 0
-                    else:
-                        self.local_highscore = 0
-                        self.session_highscore = 0
-
-                self.update_presence_scores(display_name, allowed, raw_name)
-
-            except Exception as e:
-                print(f"Error in RPC update loop: {e}")
-
-            time.sleep(10)
-
-        if self.rpc_running:
-            self.stop_rpc()
-
-    def update_presence_scores(self, display_name, allowed, raw_name):
-        try:
-            if not allowed:
-                display_name = "Unknown Scenario"
-                current_session_score = 0
-            else:
-
-                stats_dir = os.path.join(self.installation_path, "stats")
-                current_session_score, found_new_score = find_fight_time_and_score(
-                    raw_name, stats_dir, self.checked_files
-                )
-
-                if found_new_score:
-                    self.scenario_played = True
-                    self.session_highscore = max(self.session_highscore, current_session_score)
-
-
-                    if self.settings.get("show_online_scores") and self.settings.get("webapp_username"):
-                        username = self.settings.get("webapp_username")
-                        if self.online_api.update_local_score(raw_name, self.session_highscore, username):
-
-                            self.online_scores[raw_name] = self.session_highscore
-                            print(f"New all-time high detected for '{raw_name}': {self.session_highscore}")
-                elif not self.scenario_played:
-                    self.session_highscore = 0
-
-            display_highscore = self.local_highscore
-            online_score = None
-
-            if self.settings.get("show_online_scores") and self.settings.get("webapp_username"):
-                username = self.settings.get("webapp_username")
-                online_score = self.online_api.get_online_score(username, display_name)
-                if online_score is not None:
-                    display_highscore = online_score
-                    print(f"Using online highscore for '{display_name}': {online_score}")
-                else:
-                    print(f"No online score found for '{display_name}', using local: {self.local_highscore}")
-
-            update_presence(
-                self.rpc,
-                display_name,
-                self.start_time,
-                display_highscore,
-                self.session_highscore,
-                online_score,
-                self.installation_path
-            )
-
-        except Exception as e:
-            print(f"Error updating presence: {e}")
+        self.engine.stop_rpc()
 
     def on_settings_saved(self, new_settings):
-        old_username = self.settings.get("webapp_username")
-        old_show_online = self.settings.get("show_online_scores")
-
         self.settings = new_settings
         save_settings(new_settings)
-        if (new_settings.get("webapp_username") and new_settings.get("show_online_scores") and
-                (new_settings.get("webapp_username") != old_username or not old_show_online)):
-            print("Reloading online scores due to settings change...")
-            self.online_scores = self.online_api.fetch_user_scenario_scores(
-                new_settings.get("webapp_username")
-            )
+        self.engine.update_settings(new_settings)
 
     def initialize_paths(self):
         try:
@@ -262,14 +129,14 @@ class SystemTrayApp:
             self.config = load_or_create_config()
             self.config["installation_path"] = self.installation_path
             save_config(self.config)
-            self.checked_files = set(self.config["checked_files"])
         except Exception as e:
-            print(f"Error initializing paths: {e}")
+            logger.error("Error initializing paths: %s", e)
 
     def quit_app(self):
         import os
-        self.stop_monitoring()
-        self.stop_rpc()
+        self.engine.stop()
+        self.engine.online_api.flush_local_scores()
+        shutdown_logging()
 
         try:
             self.icon.stop()
@@ -0,0 +1,49 @@
+import pytest
+
+from benchmarks.stub_server import StubWebapp
+from modules.engine import Engine
+from modules.kovaaks_utils import SessionReader
+from modules.online_api import OnlineScoreAPI
+from modules.process_detector import ProcessDetector
+
+
+@pytest.fixture
+def make_api(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(OnlineScoreAPI, "CACHE_DIR", str(tmp_path / "cache"))
+    servers = []
+    apis = []
+
+    def make(users, **options):
+        server = StubWebapp(users=users, **options)
+        server.__enter__()
+        servers.append(server)
+        apis.append(OnlineScoreAPI(base_url=server.base_url))
+        return apis[-1], server
+
+    yield make
+    for api in apis:
+        api.flush_local_scores()
+    for server in servers:
+        server.__exit__()
+
+
+@pytest.fixture
+def make_engine(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(OnlineScoreAPI, "CACHE_DIR", str(tmp_path / "cache"))
+    installation_path = tmp_path / "FPSAimTrainer"
+    (installation_path / "stats").mkdir(parents=True)
+    engines = []
+
+    def make(settings=None, presence_factory=None, finder=lambda: None):
+        engine = Engine(settings or {}, str(installation_path), presence_factory=presence_factory,
+                        process_detector=ProcessDetector(finder=finder),
+                        session_reader=SessionReader(str(tmp_path / "session.sav")))
+        engines.append(engine)
+        return engine
+
+    yield make
+    for engine in engines:
+        engine.stop()
+        engine.run_history.close()
@@ -0,0 +1,37 @@
+import os
+from datetime import datetime, timedelta
+
+from benchmarks import generators
+
+SCENARIO = "Gridshot Ultimate"
+
+
+def write_run(engine, played_at, score, mtime):
+    path = os.path.join(engine.stats_directory, generators.stats_file_name(SCENARIO, played_at))
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(generators.stats_csv(SCENARIO, score))
+    os.utime(path, ns=(mtime, mtime))
+    return path
+
+
+def test_each_run_is_counted_once(make_engine):
+    engine = make_engine()
+    path = write_run(engine, datetime(2024, 1, 1), 1000, 1_000_000_000)
+
+    assert engine._ingest_stats_file(path) == (SCENARIO, 1000)
+    assert engine._ingest_stats_file(path) is True
+    engine.run_history.sync()
+    assert engine.run_history.run_count(SCENARIO) == 1
+
+
+def test_unseen_run_below_watermark_is_ingested(make_engine):
+    engine = make_engine()
+    played_at = datetime(2024, 1, 1)
+    newer = write_run(engine, played_at + timedelta(minutes=1), 1200, 2_000_000_000)
+    older = write_run(engine, played_at, 1100, 1_000_000_000)
+
+    engine._ingest_stats_file(newer)
+    assert engine.checked_runs.is_checked(os.path.basename(older), 1_000_000_000)
+    assert engine._ingest_stats_file(older) == (SCENARIO, 1100)
+    assert engine.run_history.run_count(SCENARIO) == 2
+    assert engine.run_history.best(SCENARIO) == 1200
@@ -0,0 +1,67 @@
+import json
+import socket
+import asyncio
+import threading
+
+import pytest
+
+from modules.control import ControlServer, send_command
+
+
+class FakeEngine:
+    def __init__(self):
+        self.settings = {"webapp_username": "me"}
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+
+    def update_settings(self, settings):
+        self.settings = settings
+
+    def close(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout=5)
+
+
+@pytest.fixture
+def server(tmp_path):
+    engine = FakeEngine()
+    saved = []
+    quits = []
+    token_file = str(tmp_path / "control_token")
+    control = ControlServer(engine, port=0, on_quit=lambda: quits.append(True), save_settings=saved.append,
+                            token_file=token_file)
+    control.start()
+    yield control, engine, saved, quits, token_file
+    control.stop()
+    engine.close()
+
+
+def exchange(port, payload):
+    with socket.create_connection(("127.0.0.1", port), timeout=5) as sock:
+        sock.sendall(payload)
+        sock.shutdown(socket.SHUT_WR)
+        return sock.makefile("rb").read()
+
+
+def test_command_with_token(server):
+    control, engine, saved, _, token_file = server
+    response = send_command("settings", port=control.port, token_file=token_file, settings={"friends": ["a"]})
+    assert response["ok"]
+    assert saved[-1]["friends"] == ["a"]
+
+
+def test_browser_post_is_rejected(server):
+    control, engine, saved, quits, _ = server
+    body = b'{"command": "settings", "settings": {"webapp_username": "evil"}}\n{"command": "quit"}\n'
+    request = (b"POST / HTTP/1.1\r\nHost: 127.0.0.1\r\nContent-Type: text/plain\r\n"
+               b"Content-Length: " + str(len(body)).encode() + b"\r\n\r\n" + body)
+    assert exchange(control.port, request) == b""
+    assert not saved and not quits
+    assert engine.settings["webapp_username"] == "me"
+
+
+def test_json_without_token_is_rejected(server):
+    control, _, saved, quits, _ = server
+    assert exchange(control.port, json.dumps({"command": "quit"}).encode() + b"\n") == b""
+    assert not quits
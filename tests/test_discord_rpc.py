@@ -0,0 +1,86 @@
+from concurrent.futures import Future
+
+from modules.discord_rpc import PresenceManager, update_presence
+
+
+class RecordingRpc:
+    def __init__(self):
+        self.updates = []
+
+    def update(self, **payload):
+        self.updates.append(payload)
+
+
+class ManualTimer:
+    def __init__(self, delay, callback):
+        self.delay = delay
+        self.callback = callback
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+def make_manager():
+    rpc = RecordingRpc()
+    timers = []
+
+    def schedule(delay, callback):
+        timers.append(ManualTimer(delay, callback))
+        return timers[-1]
+
+    return PresenceManager(rpc, schedule=schedule), rpc, timers
+
+
+def present(manager, tmp_path, highscore):
+    update_presence(manager, "Gridshot Ultimate", 0, highscore, highscore, None, str(tmp_path))
+
+
+def test_update_coalesces_into_one_send(tmp_path):
+    manager, rpc, timers = make_manager()
+    present(manager, tmp_path, 100)
+    present(manager, tmp_path, 200)
+    assert len(timers) == 1 and rpc.updates == []
+
+    timers[0].callback()
+    assert len(rpc.updates) == 1
+    assert "200" in rpc.updates[0]["large_text"]
+
+
+def test_reverting_to_last_payload_drops_pending_update(tmp_path):
+    manager, rpc, timers = make_manager()
+    present(manager, tmp_path, 100)
+    timers[0].callback()
+
+    present(manager, tmp_path, 200)
+    present(manager, tmp_path, 100)
+    timers[-1].callback()
+    assert len(rpc.updates) == 1
+    assert manager.pending is None
+
+
+class FailingRpc(RecordingRpc):
+    def __init__(self):
+        super().__init__()
+        self.fail = True
+
+    def update(self, **payload):
+        super().update(**payload)
+        future = Future()
+        if self.fail:
+            future.set_exception(OSError("pipe closed"))
+        else:
+            future.set_result(None)
+        return future
+
+
+def test_failed_update_is_retried_with_same_payload(tmp_path):
+    rpc = FailingRpc()
+    manager = PresenceManager(rpc, schedule=ManualTimer)
+    update_presence(manager, "Gridshot Ultimate", 0, 100, 100, None, str(tmp_path), urgent=True)
+    assert manager.last_payload is None
+
+    rpc.fail = False
+    update_presence(manager, "Gridshot Ultimate", 0, 100, 100, None, str(tmp_path), urgent=True)
+    assert len(rpc.updates) == 2
+    assert manager.last_payload == rpc.updates[-1]
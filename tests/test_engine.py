@@ -0,0 +1,121 @@
+import os
+import time
+import threading
+from datetime import datetime, timedelta
+
+from benchmarks import generators
+from modules.discord_rpc import PresenceManager
+from modules.engine import EngineState
+
+SCENARIO = "Gridshot Ultimate"
+TIMEOUT = 5
+FAST_INTERVAL = 0.05
+
+
+class FakeGame:
+    def __init__(self):
+        self.running = True
+
+    def find(self):
+        return self if self.running else None
+
+    def is_running(self):
+        return self.running
+
+
+class FakePresence:
+    def __init__(self, gate=None):
+        self.gate = gate
+        self.connects = 0
+        self.closed = False
+        self.updates = []
+
+    def __call__(self, client_id):
+        return self
+
+    def connect(self):
+        self.connects += 1
+        if self.gate is not None:
+            self.gate.wait(TIMEOUT)
+
+    def update(self, **payload):
+        self.updates.append(payload)
+
+    def close(self):
+        self.closed = True
+
+
+def wait_until(condition, timeout=TIMEOUT):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out waiting for engine"
+        time.sleep(0.01)
+
+
+def start_engine(make_engine, presence, game, tmp_path):
+    with open(tmp_path / "session.sav", "wb") as f:
+        f.write(generators.session_sav(SCENARIO))
+    engine = make_engine({"open_manually": False}, presence_factory=presence, finder=game.find)
+    engine.PROCESS_INTERVAL = FAST_INTERVAL
+    engine.SCENARIO_INTERVAL = FAST_INTERVAL
+    engine.start()
+    return engine
+
+
+def test_connects_when_game_starts_and_disconnects_when_it_stops(make_engine, tmp_path):
+    presence, game = FakePresence(), FakeGame()
+    engine = start_engine(make_engine, presence, game, tmp_path)
+
+    wait_until(lambda: engine.state == EngineState.IN_SCENARIO)
+    wait_until(lambda: presence.updates)
+    assert presence.updates[-1]["details"] == f"Playing: {SCENARIO}"
+
+    game.running = False
+    wait_until(lambda: engine.state == EngineState.GAME_DOWN)
+    assert presence.closed
+    assert engine.rpc is None and engine.stats_watcher is None
+
+
+def test_rpc_switched_off_during_connect_closes_client(make_engine, tmp_path):
+    gate = threading.Event()
+    presence, game = FakePresence(gate), FakeGame()
+    engine = start_engine(make_engine, presence, game, tmp_path)
+
+    wait_until(lambda: presence.connects)
+    engine.stop_rpc()
+    wait_until(lambda: not engine.rpc_wanted)
+    gate.set()
+
+    wait_until(lambda: presence.closed)
+    time.sleep(FAST_INTERVAL * 4)
+    assert engine.state == EngineState.GAME_UP
+    assert engine.rpc is None and engine.scenario_task is None
+    assert presence.updates == []
+
+
+def test_new_stats_file_sends_urgent_update(make_engine, tmp_path, monkeypatch):
+    submits = []
+    submit = PresenceManager.submit
+
+    def record_submit(self, payload, urgent=False):
+        submits.append((time.monotonic(), payload, urgent))
+        return submit(self, payload, urgent)
+
+    monkeypatch.setattr(PresenceManager, "submit", record_submit)
+    presence, game = FakePresence(), FakeGame()
+    engine = start_engine(make_engine, presence, game, tmp_path)
+    wait_until(lambda: engine.state == EngineState.IN_SCENARIO and presence.updates)
+
+    played_at = datetime.fromtimestamp(engine.start_time) + timedelta(seconds=1)
+    path = os.path.join(engine.stats_directory, generators.stats_file_name(SCENARIO, played_at))
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(generators.stats_csv(SCENARIO, 1234.5))
+    written = time.monotonic()
+
+    def session_best_sent():
+        return any("Session Best: 1234.5" in payload["large_text"] for payload in presence.updates)
+
+    wait_until(session_best_sent)
+    sent = [(at, urgent) for at, payload, urgent in submits if "Session Best: 1234.5" in payload["large_text"]]
+    assert sent[0][1] is True
+    assert sent[0][0] - written < 1.0
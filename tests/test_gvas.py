@@ -0,0 +1,47 @@
+import random
+
+import pytest
+
+from benchmarks import generators
+from modules.gvas import GvasError, parse_gvas, scenario_name_from_gvas
+from modules.kovaaks_utils import scenario_name_from_bytes
+
+SCENARIO = "VT Pasu Intermediate S5"
+FLIPS = 2000
+
+
+def read_name(data):
+    try:
+        return scenario_name_from_gvas(parse_gvas(data))
+    except GvasError:
+        return None
+
+
+def test_parses_scenario_name():
+    assert scenario_name_from_gvas(parse_gvas(generators.session_sav(SCENARIO))) == SCENARIO
+
+
+def test_truncated_files_only_raise_gvas_error():
+    data = generators.session_sav(SCENARIO)
+    for length in range(len(data)):
+        read_name(data[:length])
+
+
+def test_byte_flips_only_raise_gvas_error():
+    data = generators.session_sav(SCENARIO)
+    rng = random.Random(0)
+    for _ in range(FLIPS):
+        corrupted = bytearray(data)
+        for _ in range(rng.randint(1, 4)):
+            corrupted[rng.randrange(len(corrupted))] = rng.randrange(256)
+        read_name(bytes(corrupted))
+
+
+@pytest.mark.parametrize("data", [b"", b"GVAS", b"not a save file"])
+def test_unreadable_session_is_unknown(data):
+    assert scenario_name_from_bytes(data) == "Unknown Scenario"
+
+
+def test_unparseable_session_falls_back_to_scan():
+    data = generators.session_sav(SCENARIO)
+    assert scenario_name_from_bytes(b"XXXX" + data[4:]) == SCENARIO
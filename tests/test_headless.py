@@ -0,0 +1,13 @@
+import os
+
+import pytest
+
+from benchmarks import headless
+
+pytestmark = pytest.mark.skipif(not os.environ.get("KOVAAKS_SLOW_TESTS"),
+                                reason="set KOVAAKS_SLOW_TESTS=1 to run the headless budget checks")
+
+
+@pytest.mark.parametrize("mode", [[], ["--connected"]], ids=["game-down", "connected"])
+def test_headless_engine_stays_within_budget(tmp_path, mode):
+    assert headless.main(["--idle", "5", "--files", "200", "--data-dir", str(tmp_path)] + mode) == 0
@@ -0,0 +1,26 @@
+from modules.name_index import ScenarioNameIndex, normalize_name
+
+
+def test_normalize_strips_copy_suffixes_only():
+    assert normalize_name("VT Pasu Intermediate S5 - Copy (2)") == "vt pasu intermediate s5"
+    assert normalize_name("Pasu-copy") == "pasu"
+    assert normalize_name("Pasu Microscopy") == "pasu microscopy"
+
+
+def test_match_allows_typos():
+    index = ScenarioNameIndex(["Gridshot Ultimate", "VT Pasu Intermediate S5"])
+    assert index.match("Gridshot Ultimat") == "Gridshot Ultimate"
+    assert index.match("vt pasu intermedate s5") == "VT Pasu Intermediate S5"
+
+
+def test_match_rejects_sibling_scenarios():
+    index = ScenarioNameIndex(["VT Pasu Intermediate S5", "1wall6targets TE", "Tile Frenzy 180"])
+    assert index.match("VT Pasu Intermediate S4") is None
+    assert index.match("1wall5targets TE") is None
+    assert index.match("Tile Frenzy 90") is None
+
+
+def test_exact_uses_normalized_key():
+    index = ScenarioNameIndex(["Gridshot Ultimate"])
+    assert index.exact("gridshot ultimate - Copy") == "Gridshot Ultimate"
+    assert index.exact("Gridshot Ultimat") is None
@@ -0,0 +1,80 @@
+import time
+
+from benchmarks import generators
+
+
+def test_fetch_all_pages_returns_every_entry(make_api):
+    entries = generators.total_play_entries(1000)
+    api, _ = make_api({"me": entries})
+    assert len(api.fetch_all_pages("me")) == 1000
+
+
+def test_failed_page_is_not_cached(make_api):
+    entries = generators.total_play_entries(1000)
+    api, server = make_api({"me": entries}, fail_pages={3})
+    assert api.fetch_all_pages("me") is None
+
+    api._claim_refresh("me")
+    api._refresh_scores("me", None)
+    assert api.cache.get("me") is None
+
+
+def test_refresh_repairs_incomplete_cache(make_api):
+    entries = generators.total_play_entries(1000)
+    api, server = make_api({"me": entries})
+    complete = api.extract_highest_scores(entries)
+    partial = dict(list(complete.items())[:900])
+
+    api._claim_refresh("me")
+    api._refresh_scores("me", partial)
+    assert len(api.cache.get("me").scores) == 1000
+
+
+def wait_for_refresh(api, timeout=10):
+    deadline = time.monotonic() + timeout
+    while api.refreshing and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not api.refreshing
+
+
+def test_stale_cache_is_served_and_refreshed_in_full(make_api):
+    entries = generators.total_play_entries(1000)
+    api, server = make_api({"me": entries})
+    cached = api.extract_highest_scores(entries)
+    api.cache.put("me", cached, fetched_at=time.time() - api.CACHE_TTL.total_seconds() - 1)
+    changed = entries[550]
+    changed["score"] += 1000
+
+    assert api.fetch_user_scenario_scores("me") == cached
+    wait_for_refresh(api)
+    assert api.cache.get("me").scores[changed["scenarioName"]] == changed["score"]
+    assert api.cache.is_fresh("me")
+    assert len(server.requests) == 10
+
+
+def friend_entries(entries, factor):
+    return [dict(entry, score=round(entry["score"] * factor, 2)) for entry in entries]
+
+
+def test_fetch_friends_scores_caches_each_friend(make_api):
+    entries = generators.total_play_entries(150)
+    api, server = make_api({"alice": friend_entries(entries, 1.0), "bob": friend_entries(entries, 1.5)})
+    api.fetch_friends_scores(["alice", "bob", ""])
+    assert sorted(api.cache.usernames()) == ["alice", "bob"]
+    assert len(api.cache.get("bob").scores) == 150
+
+    requests = len(server.requests)
+    api.fetch_friends_scores(["alice", "bob"])
+    assert len(server.requests) == requests
+
+
+def test_best_friend_score_picks_highest(make_api):
+    entries = generators.total_play_entries(20)
+    scenario = entries[0]["scenarioName"]
+    api, _ = make_api({"alice": friend_entries(entries, 1.0), "bob": friend_entries(entries, 1.5)})
+    api.fetch_friends_scores(["alice", "bob"])
+
+    assert api.best_friend_score(["alice", "bob"], scenario) == ("bob", round(entries[0]["score"] * 1.5, 2))
+    assert api.best_friend_score(["alice"], scenario) == ("alice", entries[0]["score"])
+    assert api.best_friend_score(["carol"], scenario) is None
+    assert api.best_friend_score(["alice", "bob"], "Not A Scenario") is None
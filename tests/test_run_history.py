@@ -0,0 +1,37 @@
+import pytest
+
+from benchmarks import generators
+from modules import run_history
+from modules.run_history import RunHistory
+
+FILE_COUNT = 40
+
+
+@pytest.fixture
+def history(tmp_path, monkeypatch):
+    monkeypatch.setattr(run_history, "PARALLEL_THRESHOLD", 10)
+    stats_directory = tmp_path / "stats"
+    generators.generate_stats_directory(str(stats_directory), FILE_COUNT)
+    history = RunHistory(str(stats_directory), str(tmp_path / "history.db"))
+    yield history
+    history.close()
+
+
+def no_pool(*args, **kwargs):
+    raise AssertionError("process pool started for a single worker")
+
+
+def test_single_worker_default_ingests_serially(history, monkeypatch):
+    monkeypatch.setattr(run_history, "default_workers", lambda: 1)
+    monkeypatch.setattr(run_history, "ingest_runs", no_pool)
+    assert len(history.sync()) == FILE_COUNT
+
+
+def test_explicit_single_worker_ingests_serially(history, monkeypatch):
+    monkeypatch.setattr(run_history, "ingest_runs", no_pool)
+    assert len(history.sync(workers=1)) == FILE_COUNT
+
+
+def test_parallel_ingest_records_every_run(history):
+    assert len(history.sync(workers=2)) == FILE_COUNT
+    assert history.sync() == []
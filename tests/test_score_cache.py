@@ -0,0 +1,45 @@
+import time
+
+from modules.score_cache import ScoreCache, CacheEntry
+
+
+def scores(prefix, count=10):
+    return {f"{prefix} {index}": float(index) for index in range(count)}
+
+
+def test_evicts_least_recently_used(tmp_path):
+    size = CacheEntry(scores("a"), 0, 60).size
+    cache = ScoreCache(str(tmp_path / "scores.json"), max_bytes=size * 2)
+    cache.put("alice", scores("a"))
+    cache.put("bob", scores("b"))
+    cache.get("alice")
+    cache.put("carol", scores("c"))
+
+    assert cache.usernames() == ["alice", "carol"]
+    assert cache.scores_for("b 1") == {}
+    assert cache.scores_for("a 1") == {"alice": 1.0}
+
+
+def test_eviction_survives_reload(tmp_path):
+    path = str(tmp_path / "scores.json")
+    cache = ScoreCache(path)
+    cache.put("alice", scores("a"))
+    cache.put("bob", scores("b"))
+    cache.get("alice")
+
+    reloaded = ScoreCache(path, max_bytes=CacheEntry(scores("a"), 0, 60).size)
+    reloaded.put("carol", scores("c"))
+    assert reloaded.usernames() == ["carol"]
+    assert ScoreCache(path).usernames() == ["carol"]
+
+
+def test_entries_expire_after_ttl(tmp_path):
+    cache = ScoreCache(str(tmp_path / "scores.json"))
+    cache.put("alice", scores("a"), ttl=60)
+    cache.put("bob", scores("b"), ttl=60, fetched_at=time.time() - 61)
+
+    assert cache.is_fresh("alice")
+    assert not cache.is_fresh("bob")
+    assert not cache.is_fresh("carol")
+    assert cache.get("bob").scores == scores("b")
+    assert not cache.get("alice").is_fresh(now=time.time() + 61)
@@ -0,0 +1,60 @@
+import os
+import sys
+import time
+import queue
+from datetime import datetime, timedelta
+
+import pytest
+
+from benchmarks import generators
+from modules.stats_watcher import InotifyWatcher, PollingWatcher
+
+MAX_DELAY = 1.0
+
+WATCHERS = [
+    pytest.param(InotifyWatcher, marks=pytest.mark.skipif(not sys.platform.startswith("linux"),
+                                                          reason="inotify is Linux only")),
+    PollingWatcher,
+]
+
+
+@pytest.fixture(params=WATCHERS)
+def watched(request, tmp_path):
+    directory = str(tmp_path / "stats")
+    os.makedirs(directory)
+    delivered = queue.Queue()
+
+    def callback(file_path):
+        delivered.put((time.monotonic(), os.path.basename(file_path)))
+        return True
+
+    watcher = request.param(directory, callback)
+    watcher.start()
+    yield directory, delivered
+    watcher.stop()
+
+
+def write_run(directory, scenario, score, played_at):
+    file_name = generators.stats_file_name(scenario, played_at)
+    with open(os.path.join(directory, file_name), "w", newline="") as f:
+        f.write(generators.stats_csv(scenario, score))
+    return file_name, time.monotonic()
+
+
+def test_new_csv_is_delivered_within_a_second(watched):
+    directory, delivered = watched
+    played_at = datetime(2024, 1, 1)
+    for index in range(3):
+        file_name, written = write_run(directory, "VT Pasu Intermediate S5", 800 + index,
+                                       played_at + timedelta(minutes=index))
+        seen, name = delivered.get(timeout=5)
+        assert name == file_name
+        assert seen - written < MAX_DELAY
+
+
+def test_other_files_are_ignored(watched):
+    directory, delivered = watched
+    with open(os.path.join(directory, "notes.txt"), "w") as f:
+        f.write("not a run")
+    with pytest.raises(queue.Empty):
+        delivered.get(timeout=1.2)